@@ -0,0 +1,45 @@
+"""
+Compare access paths of ParamsDict with plain dict access: hits, misses with defaults and nested paths.
+Attribute misses raise AttributeError in Python code, get, in and get_path show the cost of cheap misses.
+
+    python -m benchmarks.access --number 1000000
+"""
+import argparse
+import timeit
+
+from paramflow.frozen import freeze
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ParamsDict access benchmark')
+    parser.add_argument('--number', type=int, default=1000000, help='accesses per measurement')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    plain = {'model': {'encoder': {'dim': 64}}, 'lr': 0.1}
+    params = freeze({'model': {'encoder': {'dim': 64}}, 'lr': 0.1})
+    cases = [
+        ('dict hit', lambda: plain['lr']),
+        ('dict.get miss', lambda: plain.get('missing', 1)),
+        ('dict nested hit', lambda: plain['model']['encoder']['dim']),
+        ('ParamsDict attr hit', lambda: params.lr),
+        ('ParamsDict item hit', lambda: params['lr']),
+        ('ParamsDict.get miss', lambda: params.get('missing', 1)),
+        ('in miss', lambda: 'missing' in params),
+        ('getattr miss with default', lambda: getattr(params, 'missing', 1)),
+        ('hasattr miss', lambda: hasattr(params, 'missing')),
+        ('ParamsDict nested attr hit', lambda: params.model.encoder.dim),
+        ('get_path hit', lambda: params.get_path('model.encoder.dim')),
+        ('get_path miss with default', lambda: params.get_path('model.decoder.dim', 1)),
+    ]
+    for name, func in cases:
+        try:
+            func()
+        except AttributeError:  # get_path on older versions
+            continue
+        t = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        print(f'{name:28} {t / args.number * 1e9:8.1f} ns')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Measure ArgsParser on a large params tree, without flags and with flags on a compiled parser.
+Flags naming params are resolved by path, an unknown flag needs a parser for all params.
+
+    python -m benchmarks.args_parse --keys 3000
+"""
+import argparse
+import sys
+import timeit
+
+from paramflow.parser import ArgsParser, _compile_arg_parser
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ArgsParser benchmark')
+    parser.add_argument('--keys', type=int, default=3000, help='number of params')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    params = {'default': {f'group{j // 100}': {f'key{i}': i for i in range(j, j + 100)}
+                          for j in range(0, args.keys, 100)}}
+    args_parser = ArgsParser('', 'default')
+
+    def run(argv, ref=params):
+        sys.argv = argv
+        args_parser(ref)
+
+    def new_params():  # every load merges overrides into new params
+        return {'default': dict(params['default'])}
+
+    no_flags = ['bench.py']
+    flags = ['bench.py', '--group0__key1', '7']
+    print(f'{args.keys} params')
+    t = min(timeit.repeat(lambda: run(no_flags), number=1, repeat=args.repeat))
+    print(f'no flags:           {t * 1e3:.3f} ms')
+    _compile_arg_parser.cache_clear()
+    t = min(timeit.repeat(lambda: run(flags), number=1, repeat=1))
+    print(f'flags, cold parser: {t * 1e3:.3f} ms')
+    t = min(timeit.repeat(lambda: run(flags), number=1, repeat=args.repeat))
+    print(f'flags, warm parser: {t * 1e3:.3f} ms')
+    t = min(timeit.repeat(lambda: run(flags, new_params()), number=1, repeat=args.repeat))
+    print(f'flags, new params:  {t * 1e3:.3f} ms')
+    unknown = flags + ['--extra', '1']
+    t = min(timeit.repeat(lambda: run(unknown, new_params()), number=1, repeat=args.repeat))
+    print(f'unknown flag:       {t * 1e3:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
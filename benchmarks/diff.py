@@ -0,0 +1,60 @@
+"""
+Compare pf.diff with diffing unfrozen trees, for a large config and a version of it with one changed param
+that shares unchanged subtrees, like reloaded params or activated profiles.
+
+    python -m benchmarks.diff --keys 100000
+"""
+import argparse
+import timeit
+
+import paramflow as pf
+from paramflow.params import merge_shared
+
+
+def unfrozen_diff(old, new, path='', changes=None):
+    # diff of plain trees, visits every key
+    changes = [] if changes is None else changes
+    for key, value in new.items():
+        sub_path = f'{path}__{key}' if path else key
+        if key not in old:
+            changes.append(sub_path)
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            unfrozen_diff(old[key], value, sub_path, changes)
+        elif old[key] != value:
+            changes.append(sub_path)
+    changes.extend(f'{path}__{key}' if path else key for key in old if key not in new)
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='params diff benchmark')
+    parser.add_argument('--keys', type=int, default=100000, help='number of params')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    params = pf.freeze({f'section{i}': {f'key{j}': {'value': j, 'name': f'name{j}'} for j in range(100)}
+                        for i in range(args.keys // 100)})
+    changed = pf.freeze(merge_shared(params, {'section0': {'key0': {'value': -1}}}))
+    rebuilt = pf.freeze(pf.unfreeze(changed))
+
+    def unfrozen():
+        return unfrozen_diff(pf.unfreeze(params), pf.unfreeze(changed))
+
+    assert unfrozen() == pf.diff(params, changed).changed == pf.diff(params, rebuilt).changed
+    cases = [
+        ('unfreeze and diff', unfrozen),
+        ('pf.diff shared subtrees', lambda: pf.diff(params, changed)),
+        ('pf.diff rebuilt tree', lambda: pf.diff(params, rebuilt)),
+        ('pf.diff fingerprinted', lambda: pf.diff(params, rebuilt)),
+    ]
+    print(f'{args.keys} params, 1 changed')
+    for name, func in cases:
+        if name == 'pf.diff fingerprinted':
+            params.fingerprint()
+            rebuilt.fingerprint()
+        t = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f'{name:24} {t * 1e3:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare scanning env vars once per env layer with a single shared EnvIndex snapshot,
+and converting values in the merge with converting them by a shared ConversionPlan.
+
+    python -m benchmarks.env_scan --env-vars 10000 --layers 3
+"""
+import argparse
+import os
+import timeit
+
+from paramflow.convert import ConversionPlan, infer_type
+from paramflow.params import deep_merge
+from paramflow.parser import EnvIndex, get_env_params, _set_nested
+
+
+def scan_env_params(env, prefix, ref_params):
+    # env scan as done before EnvIndex, every layer walks all env vars
+    params = {}
+    for env_key, env_value in env.items():
+        if env_key.startswith(prefix):
+            keys = env_key[len(prefix):].lower().split('__')
+            ref = ref_params
+            for k in keys:
+                ref = ref.get(k) if isinstance(ref, dict) else None
+                if ref is None:
+                    break
+            _set_nested(params, keys, env_value if ref is not None else infer_type(env_value))
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description='env scanning benchmark')
+    parser.add_argument('--env-vars', type=int, default=10000, help='number of unrelated env vars')
+    parser.add_argument('--matching', type=int, default=20, help='number of env vars matching the prefix')
+    parser.add_argument('--layers', type=int, default=3, help='number of env layers per load')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.update({f'VAR_{i}_NAME': str(i) for i in range(args.env_vars)})
+    os.environ.update({f'P_GROUP{i % 4}__KEY{i}': str(i) for i in range(args.matching)})
+    env = os.environ
+    ref_params = {f'group{i}': {f'key{j}': j for j in range(args.matching)} for i in range(4)}
+
+    def scan():
+        for _ in range(args.layers):
+            scan_env_params(env, 'P_', ref_params)
+
+    def indexed():
+        index = EnvIndex(env)
+        for _ in range(args.layers):
+            get_env_params(index, 'P_', ref_params)
+
+    def merge_converted():
+        index = EnvIndex(env)
+        params = {key: dict(value) for key, value in ref_params.items()}
+        for _ in range(args.layers):
+            deep_merge(params, get_env_params(index, 'P_', params))
+
+    def plan_converted():
+        index = EnvIndex(env)
+        plan = ConversionPlan()
+        params = {key: dict(value) for key, value in ref_params.items()}
+        for _ in range(args.layers):
+            deep_merge(params, get_env_params(index, 'P_', params, plan))
+
+    assert scan_env_params(env, 'P_', ref_params) == get_env_params(env, 'P_', ref_params)
+    scan_time = min(timeit.repeat(scan, number=1, repeat=args.repeat))
+    indexed_time = min(timeit.repeat(indexed, number=1, repeat=args.repeat))
+    merge_time = min(timeit.repeat(merge_converted, number=1, repeat=args.repeat))
+    plan_time = min(timeit.repeat(plan_converted, number=1, repeat=args.repeat))
+    print(f'{args.env_vars} env vars, {args.layers} layers per load')
+    print(f'scan per layer: {scan_time * 1e3:.3f} ms')
+    print(f'shared index:   {indexed_time * 1e3:.3f} ms ({scan_time / indexed_time:.1f}x)')
+    print(f'merge converts: {merge_time * 1e3:.3f} ms')
+    print(f'plan converts:  {plan_time * 1e3:.3f} ms ({merge_time / plan_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
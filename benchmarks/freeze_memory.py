@@ -0,0 +1,63 @@
+"""
+Measure peak RSS of freeze and unfreeze for a params tree with many leaf values.
+Every stage runs in a fresh interpreter, peak RSS growth over the built tree is reported.
+
+    python -m benchmarks.freeze_memory --leaves 1000000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+
+STAGES = ('freeze', 'freeze_frozen', 'unfreeze')
+
+
+def build_tree(leaves: int) -> dict:
+    # half of the leaves in nested dicts, half in lists
+    sections = max(leaves // 2000, 1)
+    return {
+        f'section{i}': {
+            'values': {f'key{j}': float(j) for j in range(1000)},
+            'list': [float(j) for j in range(1000)],
+        }
+        for i in range(sections)
+    }
+
+
+def max_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_stage(stage: str, leaves: int) -> None:
+    import paramflow as pf
+    params = build_tree(leaves)
+    if stage in ('freeze_frozen', 'unfreeze'):
+        params = pf.freeze(params)
+    before = max_rss_kb()
+    if stage == 'unfreeze':
+        result = pf.unfreeze(params)
+    else:
+        result = pf.freeze(params)
+    print(max_rss_kb() - before, len(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='freeze memory benchmark')
+    parser.add_argument('--leaves', type=int, default=1000000, help='number of leaf values')
+    parser.add_argument('--stage', choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage is not None:
+        run_stage(args.stage, args.leaves)
+        return
+
+    print(f'{args.leaves} leaves, peak RSS growth')
+    for stage in STAGES:
+        out = subprocess.run([sys.executable, '-m', 'benchmarks.freeze_memory',
+                              '--leaves', str(args.leaves), '--stage', stage],
+                             capture_output=True, text=True, check=True).stdout
+        print(f'{stage:15} {int(out.split()[0]) / 1024:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Check that `import paramflow` stays below an import time budget and does not import format backends.
+
+    python -m benchmarks.import_time --budget-us 50000
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+BACKENDS = ('yaml', 'tomllib', 'configparser', 'dotenv')
+
+
+def measure(runs: int) -> tuple:
+    """
+    :param runs: number of fresh interpreters to import paramflow in
+    :return: best cumulative import time of paramflow in microseconds and modules imported by it
+    """
+    best = None
+    modules = set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import paramflow'],
+                             capture_output=True, text=True, check=True).stderr
+        total = None
+        for line in out.splitlines():
+            match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)', line)
+            if match is None:
+                continue
+            modules.add(match.group(4))
+            if match.group(4) == 'paramflow':
+                total = int(match.group(2))
+        best = total if best is None else min(best, total)
+    return best, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='paramflow import time benchmark')
+    parser.add_argument('--budget-us', type=int, default=50000, help='import time budget in microseconds')
+    parser.add_argument('--runs', type=int, default=5, help='number of measurements, best one is used')
+    args = parser.parse_args()
+
+    total, modules = measure(args.runs)
+    print(f'import paramflow: {total} us (budget {args.budget_us} us)')
+    failed = False
+    for backend in BACKENDS:
+        if backend in modules:
+            print(f'FAIL: backend {backend} imported eagerly')
+            failed = True
+    if total > args.budget_us:
+        print('FAIL: import time over budget')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare merging all profile sections with merging only sections of the activated profile,
+for sources with many profiles.
+
+    python -m benchmarks.profiles --profiles 500 --layers 3
+"""
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+from paramflow.frozen import freeze
+from paramflow.params import build_parsers, parse
+
+
+def write_source(path, suffix, profiles, keys, layer):
+    params = {'default': {f'key{j}': {'value': j, 'layer': layer} for j in range(keys)}}
+    for i in range(profiles):
+        params[f'profile{i}'] = {f'key{j}': {'value': i * j} for j in range(0, keys, 4)}
+    with open(path, 'w') as fp:
+        if suffix == '.yaml':
+            import yaml
+            yaml.safe_dump(params, fp)
+        else:
+            json.dump(params, fp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='profile selection benchmark')
+    parser.add_argument('--profiles', type=int, default=500, help='number of profiles per source')
+    parser.add_argument('--keys', type=int, default=20, help='number of params per profile')
+    parser.add_argument('--layers', type=int, default=3, help='number of sources')
+    parser.add_argument('--format', choices=['json', 'yaml'], default='json')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    suffix = '.' + args.format
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f'layer{i}{suffix}') for i in range(args.layers)]
+        for i, path in enumerate(paths):
+            write_source(path, suffix, args.profiles, args.keys, i)
+        meta = freeze({'default_profile': 'default', 'env_prefix': None})
+        profile = f'profile{args.profiles // 2}'
+
+        def merge_all():
+            return parse(build_parsers(paths, meta), 'default', profile, select_profiles=False)
+
+        def selected():
+            return parse(build_parsers(paths, meta, defer_sections=True), 'default', profile)
+
+        assert merge_all() == selected()
+        all_time = min(timeit.repeat(merge_all, number=1, repeat=args.repeat))
+        selected_time = min(timeit.repeat(selected, number=1, repeat=args.repeat))
+    print(f'{args.layers} {args.format} sources, {args.profiles} profiles each')
+    print(f'merge all profiles:     {all_time * 1e3:.3f} ms')
+    print(f'merge selected profile: {selected_time * 1e3:.3f} ms ({all_time / selected_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
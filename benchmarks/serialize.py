@@ -0,0 +1,51 @@
+"""
+Compare round trips of frozen params through pf.dumps/pf.loads, pickle and json.
+json and pickle of plain trees need a freeze pass after loading, pf.loads and pickle of frozen trees do not.
+
+    python -m benchmarks.serialize --keys 100000
+"""
+import argparse
+import json
+import pickle
+import timeit
+
+import paramflow as pf
+
+
+def make_params(keys):
+    return {f'section{i // 100}': {f'key{i}': {'value': i, 'rate': i / 3, 'name': f'name{i}', 'on': i % 2 == 0}
+                                   for i in range(i, min(i + 100, keys))}
+            for i in range(0, keys, 100)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='serialization round trip benchmark')
+    parser.add_argument('--keys', type=int, default=100000, help='number of nested param dicts')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    params = pf.freeze(make_params(args.keys))
+    cases = [
+        ('pf pickle', lambda: pf.dumps(params), pf.loads),
+        ('pf binary', lambda: pf.dumps(params, 'binary'), lambda data: pf.loads(data, 'binary')),
+        ('pickle frozen', lambda: pickle.dumps(params, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ('pickle plain + freeze', lambda: pickle.dumps(pf.unfreeze(params), protocol=pickle.HIGHEST_PROTOCOL),
+         lambda data: pf.freeze(pickle.loads(data))),
+        ('json + freeze', lambda: json.dumps(params), lambda data: pf.freeze(json.loads(data))),
+    ]
+    try:
+        import msgpack  # noqa: F401
+        cases.insert(1, ('pf msgpack', lambda: pf.dumps(params, 'msgpack'), lambda data: pf.loads(data, 'msgpack')))
+    except ImportError:
+        pass
+    print(f'{args.keys} keys')
+    for name, dump, load in cases:
+        data = dump()
+        assert load(data) == params
+        dump_time = min(timeit.repeat(dump, number=1, repeat=args.repeat))
+        load_time = min(timeit.repeat(lambda: load(data), number=1, repeat=args.repeat))
+        print(f'{name:22} dump {dump_time * 1e3:8.1f} ms  load {load_time * 1e3:8.1f} ms  size {len(data) / 1e6:6.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Benchmark suite for pf.load stages on synthetic configs.
+
+Every stage is measured separately for each config size: file parse per format, env scan,
+argparse build, deep_merge, activate_profile, freeze, attribute access and unfreeze.
+Results can be saved as a JSON baseline and compared with a previous baseline:
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 1.25
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List
+
+from paramflow.frozen import freeze, unfreeze
+from paramflow.params import activate_profile, deep_merge
+from paramflow.parser import PARSER_MAP, ArgsParser, EnvIndex, get_env_params, _compile_arg_parser
+
+SECTION_SIZE = 100
+DEFAULT_SIZES = (10, 1000, 100000)
+FORMATS = ('toml', 'yaml', 'json', 'ini')
+
+
+def generate_params(keys: int) -> Dict[str, Any]:
+    """
+    :param keys: number of leaf params
+    :return: params in sections of SECTION_SIZE keys with int, float, str and bool values
+    """
+    params = {}
+    for i in range(keys):
+        section = params.setdefault(f'section{i // SECTION_SIZE}', {})
+        kind = i % 4
+        if kind == 0:
+            section[f'key{i}'] = i
+        elif kind == 1:
+            section[f'key{i}'] = i / 7
+        elif kind == 2:
+            section[f'key{i}'] = f'value{i}'
+        else:
+            section[f'key{i}'] = i % 3 == 0
+    return params
+
+
+def generate_profiles(default: Dict[str, Any], profiles: int) -> Dict[str, Any]:
+    # every profile overrides the first key of every section
+    params = {'default': default}
+    for p in range(profiles):
+        params[f'profile{p}'] = {name: {next(iter(section)): section[next(iter(section))]}
+                                 for name, section in default.items()}
+    return params
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        return f'"{value}"'
+    return repr(value)
+
+
+def write_config(params: Dict[str, Any], fmt: str, path: str) -> None:
+    with open(path, 'w') as fp:
+        if fmt == 'json':
+            json.dump(params, fp)
+        elif fmt == 'yaml':
+            import yaml
+            yaml.safe_dump(params, fp)
+        else:  # toml and ini, two levels of sections
+            for profile, sections in params.items():
+                for name, section in sections.items():
+                    header = f'{profile}.{name}' if fmt == 'toml' else f'{profile}__{name}'
+                    fp.write(f'[{header}]\n')
+                    for key, value in section.items():
+                        fp.write(f'{key} = {_toml_value(value) if fmt == "toml" else value}\n')
+
+
+def measure(func: Callable[[], Any], setup: Callable[[], Any] = None, repeat: int = 5) -> float:
+    """
+    :return: best wall time of func in seconds, setup runs before every measurement and is not timed
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        elapsed = timeit.timeit(func, number=1)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_size(keys: int, formats: List[str], profiles: int, env_vars: int, repeat: int,
+             tmp_dir: str) -> Dict[str, float]:
+    results = {}
+    default = generate_params(keys)
+    params = generate_profiles(default, profiles)
+
+    for fmt in formats:
+        path = os.path.join(tmp_dir, f'params_{keys}.{fmt}')
+        write_config(params, fmt, path)
+        parser = PARSER_MAP[fmt](path)
+        results[f'parse/{fmt}/{keys}'] = measure(parser, repeat=repeat)
+
+    env = {f'OTHER_{i}': str(i) for i in range(env_vars if env_vars is not None else keys)}
+    env.update({f'P_{name.upper()}__{key.upper()}': str(value)
+                for name, section in default.items() for key, value in list(section.items())[:10]})
+    results[f'env_scan/{keys}'] = measure(lambda: get_env_params(EnvIndex(env), 'P_', default), repeat=repeat)
+
+    first_key = f'section0__{next(iter(default["section0"]))}'
+    args_parser = ArgsParser('', 'default')
+    argv = ['bench.py', f'--{first_key}', '1']
+
+    def parse_args():
+        sys.argv = argv
+        args_parser(params)
+    results[f'argparse_cold/{keys}'] = measure(parse_args, _compile_arg_parser.cache_clear, repeat=repeat)
+    results[f'argparse_warm/{keys}'] = measure(parse_args, repeat=repeat)
+
+    state = {}
+
+    def copy_params():
+        state['params'] = copy.deepcopy(params)
+    override = {'default': {name: dict(list(section.items())[:10]) for name, section in default.items()}}
+    results[f'deep_merge/{keys}'] = measure(lambda: deep_merge(state['params'], override), copy_params, repeat)
+    results[f'activate_profile/{keys}'] = measure(
+        lambda: activate_profile(state['params'], 'default', 'profile0') if profiles else None, copy_params, repeat)
+
+    def copy_default():
+        state['default'] = copy.deepcopy(default)
+    results[f'freeze/{keys}'] = measure(lambda: freeze(state['default']), copy_default, repeat)
+
+    frozen = freeze(copy.deepcopy(default))
+    section = frozen.section0
+    key = next(iter(section))
+
+    def getattr_loop():
+        for _ in range(10000):
+            getattr(frozen.section0, key)
+    results[f'getattr_10k/{keys}'] = measure(getattr_loop, repeat=repeat)
+    results[f'unfreeze/{keys}'] = measure(lambda: unfreeze(frozen), repeat=repeat)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    :return: names of stages slower than baseline by more than threshold ratio
+    """
+    regressions = []
+    for name, elapsed in results.items():
+        base = baseline.get(name)
+        if base is not None and base > 0 and elapsed / base > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='paramflow benchmark suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='numbers of keys')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('--profiles', type=int, default=4, help='number of profiles besides default')
+    parser.add_argument('--env-vars', type=int, help='number of unrelated env vars, defaults to number of keys')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements per stage, best one is used')
+    parser.add_argument('--save', help='write results as JSON baseline to this file')
+    parser.add_argument('--compare', help='compare results with JSON baseline from this file')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio flagged as regression')
+    args = parser.parse_args()
+
+    results = {}
+    argv = sys.argv
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for keys in args.sizes:
+            results.update(run_size(keys, args.formats, args.profiles, args.env_vars, args.repeat, tmp_dir))
+    sys.argv = argv
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+    regressions = compare(results, baseline, args.threshold)
+    for name, elapsed in results.items():
+        line = f'{name:30} {elapsed * 1e3:12.3f} ms'
+        if name in baseline:
+            line += f' {elapsed / baseline[name]:6.2f}x'
+        if name in regressions:
+            line += '  REGRESSION'
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump(results, fp, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
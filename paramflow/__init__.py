@@ -1,2 +1,10 @@
-from paramflow.frozen import freeze, unfreeze
-from paramflow.params import load
+from paramflow.frozen import freeze, unfreeze, ParamsDict, ParamsList, ParamsArray, LazyParamsDict, LazyParamsList, IndexedParamsDict
+from paramflow.params import load, load_async, load_profiles
+from paramflow.memo import cache_clear, cache_info, cache_resize
+from paramflow.watch import watch, Watcher
+from paramflow.stats import LoadStats, Stage
+from paramflow.sweep import sweep
+from paramflow.binary import ParamsView, ParamsListView, dumps, loads
+from paramflow.shared import share, attach, SharedParams
+from paramflow.compiled import compile, load_compiled
+from paramflow.diff import diff, delta, ParamsDiff
@@ -0,0 +1,466 @@
+import struct
+from array import array
+from collections.abc import ItemsView, Mapping, Sequence
+from typing import Any, Dict, Iterator, Union
+
+from paramflow.frozen import freeze, ParamsDict, ParamsList, ParamsArray
+
+# Offset-indexed binary layout of a params tree:
+#   header: MAGIC, offset of root node (u64)
+#   node:   tag byte followed by payload, all integers little-endian
+#     N, T, F             None, True, False
+#     i                   int (i64), ints out of range are pickled
+#     f                   float (f64)
+#     s                   str: length (u32), utf-8 bytes
+#     d                   dict with str keys: number of items (u32), (key offset, value offset) per item (u64, u64),
+#                         item indices ordered by key (u32), keys are looked up by binary search
+#     m                   dict with other keys: like d without the ordered indices
+#     l                   list: number of items (u32), value offset per item (u64)
+#     a                   ParamsArray: typecode, is_bool, number of items (u64), array bytes
+#     p                   any other value: length (u32), pickle bytes
+# Children are written before their parents. Equal scalars and identical subtrees are written once,
+# so subtrees shared by a frozen tree stay shared in the encoded tree. Floats are equal if their bits are,
+# so -0.0 is not written as 0.0, other values without own tag are equal if their pickles are.
+MAGIC = b'PFB\x01'
+_HEADER = struct.Struct('<4sQ')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_ITEM = struct.Struct('<QQ')
+_ARRAY = struct.Struct('<ccQ')
+
+_CONST_TAGS = {None: b'N', True: b'T', False: b'F'}
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+class _Encoder:
+
+    def __init__(self):
+        self.buf = bytearray(_HEADER.size)
+        self.scalars: Dict[Any, int] = {}
+        self.nodes: Dict[int, int] = {}
+
+    def encode(self, value: Any) -> int:
+        typ = type(value)
+        if typ in _SCALAR_TYPES:  # most values, checked without isinstance
+            key = (typ, _F64.pack(value)) if typ is float else (typ, value)
+            offset = self.scalars.get(key)
+            if offset is None:
+                offset = self.scalars[key] = self._encode_scalar(value)
+            return offset
+        if isinstance(value, (dict, list, ParamsArray, ParamsView, ParamsListView)):
+            offset = self.nodes.get(id(value))
+            if offset is None:
+                offset = self._encode_node(value)
+                self.nodes[id(value)] = offset
+            return offset
+        payload = _pickle(value)
+        key = (None, payload)
+        offset = self.scalars.get(key)
+        if offset is None:
+            offset = self.scalars[key] = self._write(b'p', payload)
+        return offset
+
+    def _encode_node(self, value: Any) -> int:
+        buf = self.buf
+        if isinstance(value, Mapping):  # dicts and views of encoded dicts
+            items = [(self.encode(k), self.encode(v)) for k, v in value.items()]
+            keys = list(value)
+            ordered = all(type(key) is str for key in keys)
+            offset = len(buf)
+            buf += b'd' if ordered else b'm'
+            buf += _U32.pack(len(items))
+            for item in items:
+                buf += _ITEM.pack(*item)
+            if ordered:
+                buf += struct.pack(f'<{len(keys)}I', *sorted(range(len(keys)), key=keys.__getitem__))
+        elif type(value) is ParamsArray:
+            offset = len(buf)
+            buf += b'a'
+            buf += _ARRAY.pack(value._data.typecode.encode(), b'\x01' if value._bool else b'\x00', len(value))
+            buf += value._data.tobytes()
+        else:  # lists and views of encoded lists
+            items = [self.encode(v) for v in value]
+            offset = len(buf)
+            buf += b'l'
+            buf += _U32.pack(len(items))
+            buf += struct.pack(f'<{len(items)}Q', *items)
+        return offset
+
+    def _encode_scalar(self, value: Any) -> int:
+        typ = type(value)
+        if typ is bool or value is None:
+            return self._write(_CONST_TAGS[value], b'')
+        if typ is str:
+            data = value.encode()
+            return self._write(b's', _U32.pack(len(data)) + data)
+        if typ is float:
+            return self._write(b'f', _F64.pack(value))
+        if typ is int and -2 ** 63 <= value < 2 ** 63:
+            return self._write(b'i', _I64.pack(value))
+        return self._write(b'p', _pickle(value))
+
+    def _write(self, tag: bytes, payload: bytes) -> int:
+        offset = len(self.buf)
+        self.buf += tag
+        self.buf += payload
+        return offset
+
+
+def _pickle(value: Any) -> bytes:
+    import pickle  # only for values without own tag, e.g. dates
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _U32.pack(len(data)) + data
+
+
+def encode(params: Any) -> bytearray:
+    """
+    Encode params tree into offset-indexed binary layout, see decode and view.
+    :param params: frozen or plain params
+    :return: encoded params
+    """
+    encoder = _Encoder()
+    root = encoder.encode(params)
+    _HEADER.pack_into(encoder.buf, 0, MAGIC, root)
+    return encoder.buf
+
+
+def dumps(params: Any, format: str = 'pickle') -> bytes:
+    """
+    Serialize params, see loads.
+    :param params: frozen or plain params
+    :param format: 'pickle' for pickle of frozen params, 'msgpack' for msgpack, which is the fastest
+                   and requires msgpack: pip install 'paramflow[msgpack]', 'binary' for the offset-indexed layout
+                   of encode, which is slower and larger, but can be read lazily by view
+    :return: serialized params
+    """
+    if format == 'pickle':
+        import pickle
+        return pickle.dumps(_frozen(params), protocol=pickle.HIGHEST_PROTOCOL)
+    if format == 'msgpack':
+        return _msgpack().packb(params, default=_msgpack_default, strict_types=True)
+    if format == 'binary':
+        return bytes(encode(params))
+    raise ValueError(f"unsupported format '{format}', expected 'pickle', 'msgpack' or 'binary'")
+
+
+def loads(data, format: str = 'pickle') -> Any:
+    """
+    Deserialize params serialized by dumps. Frozen dicts and lists are built directly, no freeze pass is needed.
+    Loading pickle can run arbitrary code, load only data you trust in the pickle format.
+    :param data: bytes-like object with serialized params
+    :param format: format of data, see dumps
+    :return: frozen params
+    """
+    if format == 'pickle':
+        import pickle
+        return pickle.loads(data)
+    if format == 'msgpack':
+        return _msgpack_unpack(_msgpack(), data)
+    if format == 'binary':
+        return decode(data)
+    raise ValueError(f"unsupported format '{format}', expected 'pickle', 'msgpack' or 'binary'")
+
+
+def _frozen(params: Any) -> Any:
+    if isinstance(params, (ParamsView, ParamsListView)):
+        return params.materialize()
+    if isinstance(params, (ParamsDict, ParamsList, ParamsArray)):
+        return params
+    import copy
+    return freeze(copy.deepcopy(params))  # freeze replaces nested nodes of plain params in place
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("msgpack format requires msgpack support: pip install 'paramflow[msgpack]'")
+    return msgpack
+
+
+# msgpack extension types of values freeze keeps as they are
+_MSGPACK_TUPLE = 1
+_MSGPACK_ARRAY = 2
+
+
+def _msgpack_default(value: Any) -> Any:
+    # with strict types, subclasses of dict and list are passed here too
+    if type(value) is tuple:
+        data = _msgpack().packb(list(value), default=_msgpack_default, strict_types=True)
+        return _msgpack().ExtType(_MSGPACK_TUPLE, data)
+    if type(value) is ParamsArray:
+        header = value._data.typecode.encode() + (b'\x01' if value._bool else b'\x00')
+        return _msgpack().ExtType(_MSGPACK_ARRAY, header + value._data.tobytes())
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return list(value)
+    raise TypeError(f'can not serialize {type(value).__name__} with msgpack')
+
+
+def _msgpack_unpack(msgpack, data) -> Any:
+    def ext_hook(code: int, payload: bytes) -> Any:
+        if code == _MSGPACK_TUPLE:
+            return tuple(_msgpack_unpack(msgpack, payload))
+        if code == _MSGPACK_ARRAY:
+            values = array(payload[:1].decode())
+            values.frombytes(payload[2:])
+            return ParamsArray(values, payload[1:2] == b'\x01')
+        return msgpack.ExtType(code, payload)
+    return msgpack.unpackb(data, object_hook=ParamsDict, list_hook=ParamsList, ext_hook=ext_hook,
+                           strict_map_key=False)
+
+
+def _root(buf) -> int:
+    if len(buf) < _HEADER.size:
+        raise ValueError('not encoded params: buffer too short')
+    magic, root = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f'not encoded params: bad magic {magic!r}')
+    return root
+
+
+def _decode_scalar(buf, offset: int, tag: bytes) -> Any:
+    if tag == b's':
+        n, = _U32.unpack_from(buf, offset + 1)
+        return str(buf[offset + 5:offset + 5 + n], 'utf-8')
+    if tag == b'i':
+        return _I64.unpack_from(buf, offset + 1)[0]
+    if tag == b'f':
+        return _F64.unpack_from(buf, offset + 1)[0]
+    if tag == b'N':
+        return None
+    if tag == b'T':
+        return True
+    if tag == b'F':
+        return False
+    if tag == b'a':
+        typecode, is_bool, n = _ARRAY.unpack_from(buf, offset + 1)
+        start = offset + 1 + _ARRAY.size
+        data = array(typecode.decode())
+        data.frombytes(buf[start:start + n * data.itemsize])
+        return ParamsArray(data, is_bool == b'\x01')
+    if tag == b'p':
+        import pickle
+        n, = _U32.unpack_from(buf, offset + 1)
+        return pickle.loads(buf[offset + 5:offset + 5 + n])
+    raise ValueError(f'corrupted encoded params: unknown tag {tag!r} at offset {offset}')
+
+
+def _list_offsets(buf, offset: int) -> tuple:
+    n, = _U32.unpack_from(buf, offset + 1)
+    return struct.unpack_from(f'<{n}Q', buf, offset + 5)
+
+
+def _dict_items(buf, offset: int) -> Iterator[tuple]:
+    n, = _U32.unpack_from(buf, offset + 1)
+    return _ITEM.iter_unpack(buf[offset + 5:offset + 5 + n * _ITEM.size])
+
+
+def decode(buf) -> Any:
+    """
+    Decode params encoded by encode directly into a frozen tree, no freeze pass is needed.
+    Subtrees written once are decoded once and shared.
+    :param buf: bytes-like object with encoded params
+    :return: frozen params
+    """
+    memo: Dict[int, Any] = {}
+    buf = memoryview(buf)
+    try:
+        return _decode(buf, _root(buf), memo)
+    finally:
+        buf.release()
+
+
+def _decode(buf, offset: int, memo: Dict[int, Any]) -> Any:
+    value = memo.get(offset)
+    if value is not None:
+        return value
+    tag = buf[offset:offset + 1].tobytes()
+    if tag == b'd' or tag == b'm':
+        value = ParamsDict({_decode(buf, k, memo): _decode(buf, v, memo) for k, v in _dict_items(buf, offset)})
+    elif tag == b'l':
+        value = ParamsList([_decode(buf, v, memo) for v in _list_offsets(buf, offset)])
+    else:
+        value = _decode_scalar(buf, offset, tag)
+    memo[offset] = value
+    return value
+
+
+class _Reader:
+    """
+    Decodes values of encoded params on demand, every node is decoded at most once.
+    """
+
+    __slots__ = ('buf', 'cache')
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.cache: Dict[int, Any] = {}
+
+    def value(self, offset: int) -> Any:
+        try:
+            return self.cache[offset]
+        except KeyError:
+            pass
+        buf = self.buf
+        tag = buf[offset:offset + 1].tobytes()
+        if tag == b'd' or tag == b'm':
+            value = ParamsView(self, offset, tag == b'd')
+        elif tag == b'l':
+            value = ParamsListView(self, offset)
+        else:
+            value = _decode_scalar(buf, offset, tag)
+        self.cache[offset] = value
+        return value
+
+
+class ParamsView(Mapping):
+    """
+    Read-only view of an encoded params dict with the attribute and read API of ParamsDict.
+    Keys are looked up by binary search and values are decoded on first access, so the cost of a view
+    depends on keys accessed, not on its size. It is a Mapping, not a dict, use materialize to get a ParamsDict,
+    e.g. for json.dumps.
+    """
+
+    __slots__ = ('_reader', '_offset', '_ordered', '_len', '_found')
+
+    def __init__(self, reader: _Reader, offset: int, ordered: bool = True):
+        self._reader = reader
+        self._offset = offset
+        self._ordered = ordered
+        self._len = _U32.unpack_from(reader.buf, offset + 1)[0]
+        # value offsets of keys found so far, dicts with non-str keys are indexed upfront
+        self._found = {} if ordered else {reader.value(k): v for k, v in _dict_items(reader.buf, offset)}
+
+    def _lookup(self, key) -> int:
+        found = self._found.get(key)
+        if found is not None:
+            return found
+        if not self._ordered or type(key) is not str:
+            raise KeyError(key)
+        reader = self._reader
+        buf = reader.buf
+        items = self._offset + 5
+        order = items + self._len * _ITEM.size
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, value_offset = _ITEM.unpack_from(buf, items + _U32.unpack_from(buf, order + 4 * mid)[0] * _ITEM.size)
+            mid_key = reader.value(key_offset)
+            if mid_key < key:
+                lo = mid + 1
+            elif key < mid_key:
+                hi = mid
+            else:
+                self._found[key] = value_offset
+                return value_offset
+        raise KeyError(key)
+
+    def __getitem__(self, key) -> Any:
+        return self._reader.value(self._lookup(key))
+
+    def __getattr__(self, key) -> Any:
+        if key in ParamsView.__slots__:  # not initialized, e.g. while copying
+            raise AttributeError(key)
+        try:
+            return self._reader.value(self._lookup(key))
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' has no param '{key}'") from None
+
+    def __setattr__(self, key, value):
+        if key in ParamsView.__slots__:
+            object.__setattr__(self, key, value)
+        else:
+            raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __contains__(self, key) -> bool:
+        try:
+            self._lookup(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        reader = self._reader
+        return (reader.value(k) for k, _ in _dict_items(reader.buf, self._offset))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def items(self) -> ItemsView:
+        return _ParamsViewItems(self)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({dict(self.items())!r})'
+
+    def __reduce__(self):
+        # the buffer can not be pickled, views are pickled as frozen params
+        return self.materialize().__reduce__()
+
+    def materialize(self) -> ParamsDict:
+        """
+        :return: frozen params decoded from the view
+        """
+        return _decode(self._reader.buf, self._offset, {})
+
+
+class _ParamsViewItems(ItemsView):
+    # items are read in encoded order in a single pass, not looked up key by key
+
+    def __iter__(self):
+        view = self._mapping
+        reader = view._reader
+        for key_offset, value_offset in _dict_items(reader.buf, view._offset):
+            yield reader.value(key_offset), reader.value(value_offset)
+
+
+class ParamsListView(Sequence):
+    """
+    Read-only view of an encoded params list, items are decoded on first access.
+    """
+
+    __slots__ = ('_reader', '_offset', '_items')
+
+    def __init__(self, reader: _Reader, offset: int):
+        self._reader = reader
+        self._offset = offset
+        self._items = _list_offsets(reader.buf, offset)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._reader.value(offset) for offset in self._items[index]]
+        return self._reader.value(self._items[index])
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, Sequence)) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)!r})'
+
+    def __reduce__(self):
+        return self.materialize().__reduce__()
+
+    def materialize(self) -> ParamsList:
+        """
+        :return: frozen params decoded from the view
+        """
+        return _decode(self._reader.buf, self._offset, {})
+
+
+def view(buf) -> Union[ParamsView, ParamsListView]:
+    """
+    :param buf: bytes-like object with encoded params, must stay valid while the view is used
+    :return: lazy read-only view of encoded params
+    """
+    buf = memoryview(buf)
+    return _Reader(buf).value(_root(buf))
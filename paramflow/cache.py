@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+def _cache_path(cache_dir: str, path: str, kind: str) -> str:
+    key = f'{CACHE_VERSION}:{kind}:{os.path.abspath(path)}'
+    name = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f'{name}.pfc')
+
+
+def _file_key(stat: os.stat_result, data: bytes) -> Tuple[int, int, bytes]:
+    return stat.st_mtime_ns, stat.st_size, hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _owned(fp) -> bool:
+    if not hasattr(os, 'getuid'):  # no file ownership on this platform
+        return True
+    return os.fstat(fp.fileno()).st_uid == os.getuid()
+
+
+def read_cache(cache_dir: str, path: str, kind: str,
+               stat: os.stat_result, data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Read parsed params of a source file from the cache.
+    Entry is valid only if path, mtime, size and content hash of the file all match.
+    Entries not owned by the current user are ignored, so they are never unpickled.
+    :param cache_dir: cache directory
+    :param path: source file path
+    :param kind: parser kind, e.g. file extension
+    :param stat: stat of the source file
+    :param data: content of the source file
+    :return: parsed params or None on cache miss
+    """
+    cache_path = _cache_path(cache_dir, path, kind)
+    try:
+        with open(cache_path, 'rb') as fp:
+            if not _owned(fp):
+                logger.debug('Ignoring cache entry %s of another user', cache_path)
+                return None
+            key, params = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # truncated or foreign entry, treat as miss
+        logger.debug('Ignoring invalid cache entry %s: %s', cache_path, e)
+        return None
+    if key != _file_key(stat, data):
+        return None
+    return params
+
+
+def write_cache(cache_dir: str, path: str, kind: str,
+                stat: os.stat_result, data: bytes, params: Dict[str, Any]) -> None:
+    """
+    Write parsed params of a source file to the cache.
+    Entry is written to a temporary file and atomically renamed,
+    so concurrent writers and readers never observe a partial entry.
+    A missing cache directory is created readable by the current user only.
+    :param cache_dir: cache directory
+    :param path: source file path
+    :param kind: parser kind, e.g. file extension
+    :param stat: stat of the source file
+    :param data: content of the source file
+    :param params: parsed params
+    """
+    cache_path = _cache_path(cache_dir, path, kind)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                pickle.dump((_file_key(stat, data), params), fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:  # cache is best effort
+        logger.debug('Unable to write cache entry %s: %s', cache_path, e)
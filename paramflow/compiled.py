@@ -0,0 +1,82 @@
+import os
+from typing import Optional, Union
+
+from paramflow.binary import encode, view, ParamsView
+from paramflow.frozen import freeze, ParamsDict
+from paramflow.params import validate_load_args, build_parsers, parse, merge_shared, ENV_SOURCE, ARGS_SOURCE
+from paramflow.parser import EXTENDS_KEY, EnvIndex, EnvParser, ArgsParser
+
+
+def compile(*sources: str | dict,
+            out_path: str,
+            profile: Optional[str] = None,
+            default_profile: str = 'default',
+            env_prefix: str = 'P_',
+            compact: bool = False,
+            extends_key: str = EXTENDS_KEY) -> None:
+    """
+    Merge sources, activate profile and write the result in binary format for load_compiled.
+    Env vars and command-line arguments are not compiled in, load_compiled layers them on top.
+    :param sources: file or multiple files to load parameters from
+    :param out_path: path of the compiled file, written atomically
+    :param profile: profile to activate
+    :param default_profile: default profile
+    :param env_prefix: prefix for vars in .env sources
+    :param compact: store large homogeneous numeric lists as arrays, see freeze
+    :param extends_key: key of profile sections listing profiles they extend
+    """
+    validate_load_args(sources, 'profile', default_profile, extends_key)
+    if ENV_SOURCE in sources or ARGS_SOURCE in sources:
+        raise ValueError("env and args sources are layered by load_compiled, they can not be compiled")
+    meta = freeze({'env_prefix': env_prefix, 'args_prefix': None,
+                   'default_profile': default_profile, 'profile': profile, 'extends_key': extends_key})
+    params = parse(build_parsers(list(sources), meta, defer_sections=True), default_profile, profile, compact,
+                   extends_key=extends_key)
+    import tempfile
+    data = encode(params)
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        # mkstemp creates the file readable only by its owner, compiled params get permissions of a plain open
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_compiled(path: str,
+                  env_prefix: Optional[str] = 'P_',
+                  args_prefix: Optional[str] = '') -> Union[ParamsView, ParamsDict]:
+    """
+    Load params compiled by compile. The file is memory-mapped and values are decoded on first access,
+    so loading costs O(keys accessed) instead of O(file size).
+    Env vars and command-line arguments are layered on top like in load.
+    :param path: path of the compiled file
+    :param env_prefix: prefix for env vars that are used to overwrite params, if None env vars are not used
+    :param args_prefix: prefix for command-line arguments, if None command-line arguments are not used
+    :return: read-only view of compiled params, or frozen dict with views of params not overwritten
+    """
+    import mmap
+    with open(path, 'rb') as fp:
+        mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    params = view(mapped)
+    # params are already activated, a profile name that is not a key makes parsers overwrite them directly
+    default_profile = params['__profile__'][0] if '__profile__' in params else 'default'
+    parsers = []
+    if env_prefix is not None:
+        parsers.append(EnvParser(env_prefix, default_profile, env=EnvIndex(os.environ)))
+    if args_prefix is not None:
+        parsers.append(ArgsParser(args_prefix, default_profile, descr='Parameters'))
+    merged = params
+    for parser in parsers:
+        layer = parser(merged)
+        if layer:
+            merged = merge_shared(merged, layer)
+    if merged is params:
+        return params
+    return freeze(merged)
@@ -1,4 +1,8 @@
 import json
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict
+
+_MISSING = object()
 
 CONVERSION_MAP = {
     int: {
@@ -21,18 +25,58 @@ CONVERSION_MAP = {
     }
 }
 
+class ConversionError(TypeError):
+    """
+    Value can not be converted to the type of the value it overwrites. Merges add keys of the path
+    while the error propagates, so paths are only built for errors.
+    """
+
+    def __init__(self, src_type: type, dst_type: type, path: str = ''):
+        super().__init__()
+        self.src_type = src_type
+        self.dst_type = dst_type
+        self.path = path
+
+    def at(self, key: Any) -> 'ConversionError':
+        """
+        :param key: dict key or list index of the parent of the current path
+        :return: self with key prepended to path
+        """
+        self.path = (f'[{key}]' if type(key) is int else f'.{key}') + self.path
+        return self
+
+    def __str__(self) -> str:
+        path = f'{self.path} ' if self.path != '' else ''
+        return f'unable to convert {path}{self.src_type} to {self.dst_type}'
+
+
+def _kind(typ: type) -> type:
+    # frozen lists, dicts and views of compiled params convert like the plain types they stand for
+    if typ in CONVERSION_MAP or typ is list or typ is dict or typ is tuple:
+        return typ
+    if issubclass(typ, Mapping):
+        return dict
+    if issubclass(typ, tuple):
+        return tuple
+    if issubclass(typ, Sequence) and not issubclass(typ, (str, bytes)):
+        return list
+    return typ
+
+
 def convert_type(dst_value, src_value, path=''):
     dst_type = type(dst_value)
     src_type = type(src_value)
     if dst_type is src_type or dst_value is None:
         return src_value
+    src_kind = _kind(src_type)
+    dst_kind = _kind(dst_type)
+    if src_kind is dst_kind:
+        return src_value
     try:
-        convert = CONVERSION_MAP[src_type][dst_type]
+        convert = CONVERSION_MAP[src_kind][dst_kind]
         return convert(src_value)
     except Exception as e:
-        if path != '':
-            path += ' '
-        raise TypeError(f'unable to convert {path}{src_type} to {dst_type}') from e
+        raise ConversionError(src_type, dst_type, path) from e
 
 
 def infer_type(value: str):
@@ -45,3 +89,115 @@ def infer_type(value: str):
             if value.lower() in ('true', 'false'):
                 return value.lower() == 'true'
             return value
+
+
+def _keep(value: str) -> str:
+    return value
+
+
+class ConversionPlan:
+    """
+    Converters of string override values by key path, keys joined by '__'. The plan is shared by consecutive env,
+    .env and args layers and resolves a path against the params the overrides are merged into on first use,
+    so a load costs a walk per overridden path, not per param. Scalars are converted to the type of the value
+    they overwrite, strings overwriting dicts, lists and other types are kept for the merge to convert,
+    values of unknown paths are inferred.
+    """
+
+    def __init__(self):
+        self._ref = None
+        self._converters: Dict[str, Callable[[str], Any]] = {}  # memoized by path
+        self._added: Dict[str, Any] = {}  # reference values of paths added by override layers
+        self._leaves = None
+
+    def update(self, ref_params: Mapping) -> 'ConversionPlan':
+        """
+        Reset the plan unless it was built from ref_params.
+        :param ref_params: params overrides are merged into
+        :return: self
+        """
+        if ref_params is not self._ref:
+            self._ref = ref_params
+            self._converters = {}
+            self._added = {}
+            self._leaves = None
+        return self
+
+    def extend(self, params: Mapping, prefix: str = '') -> None:
+        """
+        Add paths of params missing in the plan, e.g. paths added by an override layer to the reference params.
+        """
+        for key, value in params.items():
+            if prefix == '' and type(key) is str and key.startswith('__'):
+                continue
+            path = f'{prefix}__{key}' if prefix else str(key)
+            self._added.setdefault(path, value)
+            if isinstance(value, Mapping):
+                self.extend(value, path)
+        self._leaves = None
+
+    def lookup(self, path: str, default: Any = None) -> Any:
+        """
+        :param path: keys joined by '__'
+        :return: reference value at path, default if path is not in the plan
+        """
+        node = self._ref
+        if node is not None and not path.startswith('__'):
+            for key in path.split('__'):
+                if not isinstance(node, Mapping):
+                    node = _MISSING
+                    break
+                node = node.get(key, _MISSING)
+                if node is _MISSING:
+                    break
+            if node is not _MISSING:
+                return node
+        return self._added.get(path, default)
+
+    @property
+    def leaves(self) -> Dict[str, Any]:
+        """
+        Reference values of all leaf paths, e.g. for argument types. Built by a walk of the whole reference params,
+        so prefer lookup for known paths.
+        """
+        if self._leaves is None:
+            leaves = {}
+            if self._ref is not None:
+                _collect_leaves(self._ref, '', leaves)
+            for path, value in self._added.items():
+                if not isinstance(value, Mapping) and self.lookup(path, _MISSING) is value:
+                    leaves.setdefault(path, value)
+            self._leaves = leaves
+        return self._leaves
+
+    def convert(self, path: str, value: str) -> Any:
+        """
+        :param path: keys joined by '__'
+        :param value: string value of an override
+        :return: converted value, or value unchanged if it can not be converted, so the merge reports its full path
+        """
+        convert = self._converters.get(path)
+        if convert is None:
+            ref = self.lookup(path, _MISSING)
+            if ref is _MISSING:
+                return infer_type(value)
+            convert = _keep if isinstance(ref, Mapping) else _STR_CONVERTERS.get(type(ref), _keep)
+            self._converters[path] = convert
+        try:
+            return convert(value)
+        except ValueError:
+            return value
+
+
+def _collect_leaves(params: Mapping, prefix: str, leaves: Dict[str, Any]) -> None:
+    for key, value in params.items():
+        if prefix == '' and type(key) is str and key.startswith('__'):
+            continue
+        path = f'{prefix}__{key}' if prefix else str(key)
+        if isinstance(value, Mapping):
+            _collect_leaves(value, path, leaves)
+        else:
+            leaves[path] = value
+
+
+_STR_CONVERTERS: Dict[type, Callable[[str], Any]] = {typ: CONVERSION_MAP[str][typ] for typ in (bool, int, float)}
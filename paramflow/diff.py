@@ -0,0 +1,116 @@
+from collections.abc import Mapping, Sequence
+from typing import Any, List, NamedTuple
+
+from paramflow.frozen import ParamsDict, _METADATA, _typed_fingerprint
+
+_MISSING = object()
+
+
+class ParamsDiff(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+
+_SCALARS = frozenset([str, int, float, bool, type(None)])
+
+
+def _same(old: Any, new: Any) -> bool:
+    # only type-strict digests computed already are compared, computing them would cost a pass over both trees
+    if old is new:
+        return True
+    digest = _typed_fingerprint(old)
+    return digest is not None and digest == _typed_fingerprint(new)
+
+
+def _is_node(value: Any) -> bool:
+    return type(value) not in _SCALARS
+
+
+def _sequence_kind(value: Any) -> Any:
+    # frozen and plain lists and arrays are the same kind of value, tuples are another
+    if isinstance(value, tuple):
+        return tuple
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return list
+    return None
+
+
+def _differs(old: Any, new: Any) -> bool:
+    # unlike ==, values of different types differ, e.g. 1, 1.0 and True
+    if type(old) in _SCALARS:
+        return type(old) is not type(new) or old != new
+    if old is new:
+        return False
+    if isinstance(old, Mapping):
+        if not isinstance(new, Mapping) or old.keys() != new.keys():
+            return True
+        return any(_differs(value, new[key]) for key, value in old.items())
+    kind = _sequence_kind(old)
+    if kind is not None:
+        if kind is not _sequence_kind(new) or len(old) != len(new):
+            return True
+        return any(_differs(a, b) for a, b in zip(old, new))
+    return type(old) is not type(new) or old != new
+
+
+def diff(a: Mapping, b: Mapping) -> ParamsDiff:
+    """
+    Compare params key by key. Subtrees shared by a and b, or with equal digests computed already by fingerprint
+    or hash, are skipped without visiting them, so comparing versions of params sharing unchanged subtrees,
+    e.g. reloaded or activated profiles, costs as much as the difference. Lists and other values are compared
+    by value and type, so changing 1 to 1.0 or True is a change, subtrees are skipped by type-strict digests
+    for the same reason. __source__ and __profile__ are left out.
+    :param a: params compared to
+    :param b: params compared
+    :return: paths of keys added in b, removed from a and changed, keys joined with '__', e.g. 'model__dim'
+    """
+    result = ParamsDiff([], [], [])
+    if not _same(a, b):
+        _diff(a, b, '', result)
+    return result
+
+
+def _diff(old: Mapping, new: Mapping, path: str, result: ParamsDiff) -> None:
+    for key, value in new.items():
+        if key in _METADATA:
+            continue
+        sub_path = f'{path}__{key}' if path else f'{key}'
+        old_value = old.get(key, _MISSING)
+        if old_value is _MISSING:
+            result.added.append(sub_path)
+        elif _is_node(old_value) and _same(old_value, value):
+            continue
+        elif isinstance(old_value, Mapping) and isinstance(value, Mapping):
+            _diff(old_value, value, sub_path, result)
+        elif _differs(old_value, value):
+            result.changed.append(sub_path)
+    for key in old:
+        if key not in new and key not in _METADATA:
+            result.removed.append(f'{path}__{key}' if path else f'{key}')
+
+
+def delta(params: Mapping, base: Mapping) -> ParamsDict:
+    """
+    Params differing from base, e.g. to log only overrides of defaults. Nested dicts keep only differing keys,
+    keys missing in params are not represented. Subtrees are skipped and values compared like in diff.
+    :param params: params
+    :param base: params to compare to
+    :return: frozen params added or changed in params
+    """
+    result = {}
+    for key, value in params.items():
+        if key in _METADATA:
+            continue
+        base_value = base.get(key, _MISSING)
+        if base_value is _MISSING:
+            result[key] = value
+        elif _is_node(base_value) and _same(base_value, value):
+            continue
+        elif isinstance(base_value, Mapping) and isinstance(value, Mapping):
+            nested = delta(value, base_value)
+            if nested:
+                result[key] = nested
+        elif _differs(base_value, value):
+            result[key] = value
+    return ParamsDict(result)
@@ -1,10 +1,28 @@
-import sys
-import types
-from typing import Union, List, Dict, Any
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Union, List, Dict, Any, Optional, Tuple
+
+# lists shorter than this are kept as ParamsList by compact freeze
+COMPACT_MIN_SIZE = 256
+
+_MISSING = object()
+
+
+_PATHS: Dict[str, tuple] = {}  # split paths of get_path
+_PATHS_MAX = 1024
+
+
+def _split_path(path: str) -> tuple:
+    if len(_PATHS) >= _PATHS_MAX:
+        _PATHS.clear()
+    keys = _PATHS[path] = tuple(path.split('.'))
+    return keys
 
 
 class ParamsDict(dict):
 
+    __slots__ = ('__dict__', '__weakref__', '_pf_digest', '_pf_typed_digest')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         object.__setattr__(self, '__dict__', self)
@@ -21,17 +39,143 @@ class ParamsDict(dict):
     def __delitem__(self, key):
         raise TypeError(f'{self.__class__.__name__} is immutable')
 
+    def __reduce__(self):
+        # rebuilt from a shallow copy, nested nodes reduce themselves and shared nodes are pickled once
+        return type(self), (dict.copy(self),)
+
+    def __hash__(self) -> int:
+        return _hash(self)
+
+    def fingerprint(self) -> str:
+        """
+        Content digest stable across processes and runs, e.g. for cache keys. Equal params have equal digests,
+        numbers are compared by value like by ==, so 1, 1.0 and True are the same, __source__ and __profile__ are left out.
+        Digests are computed once per node from digests of children and cached, so shared subtrees are hashed once.
+        :return: hex digest
+        """
+        return _fingerprint(self).hex()
+
     def __getattr__(self, key) -> Any:
-        try:
-            return self[key]
-        except KeyError:
-            caller = sys._getframe(1)
-            tb = types.TracebackType(None, caller, caller.f_lasti, caller.f_lineno)
-            exc = AttributeError(f"'{type(self).__name__}' has no param '{key}'")
-            raise exc.with_traceback(tb)
+        # params are found in __dict__, so this runs only for misses. Raising in Python makes a miss cost
+        # microseconds even through getattr with a default or hasattr, cheap misses go through get or get_path
+        raise AttributeError(f"'{type(self).__name__}' has no param '{key}'", name=key, obj=self)
+
+    def get_path(self, path: str, default: Any = _MISSING) -> Any:
+        """
+        Get nested param by path of keys joined with dots, list items are selected by index, e.g. 'layers.3.dim'.
+        :param path: path of the param
+        :param default: value returned if path does not exist, if not given KeyError is raised
+        :return: param value
+        """
+        keys = _PATHS.get(path)
+        if keys is None:
+            keys = _split_path(path)
+        node = self
+        for key in keys:
+            if isinstance(node, dict):
+                node = node.get(key, _MISSING)
+            elif isinstance(node, list) or type(node) is ParamsArray:
+                try:
+                    node = node[int(key)]
+                except (IndexError, ValueError):
+                    node = _MISSING
+            else:
+                node = _MISSING
+            if node is _MISSING:
+                if default is _MISSING:
+                    raise KeyError(path)
+                return default
+        return node
+
+class IndexedParamsDict(ParamsDict):
+    """
+    ParamsDict with a flat index of all nested params by path, shared by the whole tree, see freeze.
+    Paths join keys and list indices with '__' for at, or with dots for item access, e.g. params['model.dim'].
+    """
+
+    __slots__ = ('_pf_index', '_pf_prefix')
+
+    def __reduce__(self):
+        # the index is pickled as state, after the dict, so the index shared by the tree is pickled once
+        return IndexedParamsDict, (dict.copy(self),), (self._pf_index, self._pf_prefix)
+
+    def __setstate__(self, state) -> None:
+        object.__setattr__(self, '_pf_index', state[0])
+        object.__setattr__(self, '_pf_prefix', state[1])
+
+    def at(self, path: str) -> Any:
+        """
+        :param path: path of nested param relative to this dict, keys joined with '__', e.g. 'encoder__layers__3'
+        :return: param value
+        """
+        return self._pf_index[self._pf_prefix + path]
+
+    def __missing__(self, key):
+        # called by dict lookup only for keys that are not direct children
+        if type(key) is str and '.' in key:
+            try:
+                return self._pf_index[self._pf_prefix + key.replace('.', '__')]
+            except KeyError:
+                pass
+        raise KeyError(key)
+
+    def get(self, key, default=None) -> Any:
+        if type(key) is str and '.' in key and not dict.__contains__(self, key):
+            return self._pf_index.get(self._pf_prefix + key.replace('.', '__'), default)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        return type(key) is str and '.' in key and self._pf_prefix + key.replace('.', '__') in self._pf_index
+
+
+def _freeze_indexed(node: Any, prefix: str, index: Dict[str, Any], compact: bool) -> Any:
+    # freeze and index in one pass, frozen subtrees are rebuilt as their dicts need the index
+    if isinstance(node, dict):
+        items = {}
+        for key, value in node.items():
+            if type(key) is str and key.startswith('__'):  # metadata
+                items[key] = freeze(value) if isinstance(value, (dict, list)) else value
+                continue
+            path = f'{prefix}{key}'
+            value = _freeze_indexed(value, f'{path}__', index, compact)
+            index[path] = items[key] = value
+        indexed = IndexedParamsDict(items)
+        object.__setattr__(indexed, '_pf_index', index)
+        object.__setattr__(indexed, '_pf_prefix', prefix)
+        return indexed
+    if isinstance(node, list):
+        if compact and type(node) is list:
+            compacted = _compact(node)
+            if compacted is not None:
+                return compacted
+        items = []
+        for i, value in enumerate(node):
+            path = f'{prefix}{i}'
+            value = _freeze_indexed(value, f'{path}__', index, compact)
+            index[path] = value
+            items.append(value)
+        return ParamsList(items)
+    return node
+
 
 class ParamsList(list):
 
+    __slots__ = ('_pf_digest', '_pf_typed_digest')
+
+    def __reduce__(self):
+        return type(self), (list.copy(self),)
+
+    def __hash__(self) -> int:
+        return _hash(self)
+
+    def fingerprint(self) -> str:
+        """
+        :return: hex content digest, see ParamsDict.fingerprint
+        """
+        return _fingerprint(self).hex()
+
     def __setitem__(self, index, value):
         raise TypeError(f'{self.__class__.__name__} is immutable')
 
@@ -63,42 +207,386 @@ class ParamsList(list):
         raise TypeError(f'{self.__class__.__name__} is immutable')
 
 
-def freeze(params: Union[List[Any], Dict[str, Any]]) -> Union[ParamsList, ParamsDict]:
+class ParamsArray(Sequence):
+    """
+    Read-only sequence of homogeneous int, float or bool values stored in an array.array.
+    Buffer of the array is exposed read-only, so e.g. numpy.asarray(params_array.buffer) does not copy.
+    """
+
+    __slots__ = ('_data', '_bool', '_pf_digest', '_pf_typed_digest')
+
+    def __init__(self, data: array, is_bool: bool = False):
+        self._data = data
+        self._bool = is_bool
+
+    @property
+    def buffer(self) -> memoryview:
+        return memoryview(self._data).toreadonly()
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self.buffer
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ParamsArray(self._data[index], self._bool)
+        value = self._data[index]
+        return bool(value) if self._bool else value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self):
+        return map(bool, self._data) if self._bool else iter(self._data)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ParamsArray):
+            return self._bool == other._bool and self._data == other._data
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # equal to lists and tuples, see fingerprint for a digest equal to the one of ParamsList
+
+    def fingerprint(self) -> str:
+        """
+        :return: hex content digest, see ParamsDict.fingerprint
+        """
+        return _fingerprint(self).hex()
+
+    def __reduce__(self):
+        return ParamsArray, (self._data, self._bool)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)!r})'
+
+
+# Digests of nodes hash a canonical text of their children: scalars are written as a tag and a value that ends
+# unambiguously, nodes as the digest of their own text. Items of dicts are sorted, dict equality does not depend
+# on order, and numbers equal by == are written the same. Type-strict digests are computed in the same pass from
+# texts writing bools and floats with their own tags, see diff.
+_DIGEST_SIZE = 16
+_METADATA = frozenset(['__source__', '__profile__'])
+_blake2b = None
+
+
+def _encode_other(value: Any) -> Tuple[str, str]:
+    typ = type(value)
+    if typ is float:
+        text = f'f{value.hex()};'
+        return (f'i{int(value)};' if value.is_integer() else text), text
+    if value is None:
+        return 'N;', 'N;'
+    if isinstance(value, (Mapping, Sequence)) and typ is not bytes:  # also tuples and views of compiled params
+        digest, typed_digest = _digests(value)
+        return '#' + digest.hex(), '#' + typed_digest.hex()
+    # e.g. dates and bytes, repr is stable across processes unlike hash
+    text = f'{typ.__module__}.{typ.__qualname__}:{value!r}'
+    text = f'o{len(text)}:{text}'
+    return text, text
+
+
+def _encode(value: Any) -> Tuple[str, str]:
+    # texts of value for the digest and the type-strict digest
+    typ = type(value)
+    if typ is str:
+        text = f's{len(value)}:{value}'
+        return text, text
+    if typ is int:
+        text = f'i{value:d};'
+        return text, text
+    if typ is bool:
+        return f'i{value:d};', f'b{value:d};'
+    if typ is ParamsDict or typ is ParamsList:
+        digest = getattr(value, '_pf_digest', None)
+        if digest is None:
+            digest, typed_digest = _digests(value)
+        else:
+            typed_digest = value._pf_typed_digest
+        return '#' + digest.hex(), '#' + typed_digest.hex()
+    return _encode_other(value)
+
+
+def _fingerprint(node: Any) -> bytes:
+    digest = getattr(node, '_pf_digest', None)
+    return digest if digest is not None else _digests(node)[0]
+
+
+def _typed_fingerprint(node: Any) -> Optional[bytes]:
+    # cached digest telling 1, 1.0 and True apart, None until the node was fingerprinted or hashed
+    return getattr(node, '_pf_typed_digest', None)
+
+
+def _digests(node: Any) -> Tuple[bytes, bytes]:
+    global _blake2b
+    digest = getattr(node, '_pf_digest', None)
+    if digest is not None:
+        return digest, node._pf_typed_digest
+    if _blake2b is None:
+        from hashlib import blake2b  # hashlib would dominate import time of paramflow
+        _blake2b = blake2b
+    if isinstance(node, dict) or isinstance(node, Mapping):
+        items, typed_items = [], []
+        for key, value in node.items():
+            if key not in _METADATA:
+                key_text, typed_key_text = _encode(key)
+                value_text, typed_value_text = _encode(value)
+                items.append(key_text + value_text)
+                typed_items.append(typed_key_text + typed_value_text)
+        items.sort()
+        typed_items.sort()
+        text = 'd' + ''.join(items)
+        typed_text = 'd' + ''.join(typed_items)
+    else:
+        tag = 't' if isinstance(node, tuple) else 'l'
+        encoded = [_encode(value) for value in node]
+        text = tag + ''.join([value_text for value_text, _ in encoded])
+        typed_text = tag + ''.join([typed_value_text for _, typed_value_text in encoded])
+    digest = _blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=_DIGEST_SIZE).digest()
+    typed_digest = _blake2b(typed_text.encode('utf-8', 'surrogatepass'), digest_size=_DIGEST_SIZE).digest()
+    if isinstance(node, _FROZEN):
+        # typed digest first, a cached digest means both are cached
+        object.__setattr__(node, '_pf_typed_digest', typed_digest)
+        object.__setattr__(node, '_pf_digest', digest)
+    return digest, typed_digest
+
+
+def _hash(node: Any) -> int:
+    return int.from_bytes(_fingerprint(node)[:8], 'little', signed=True)
+
+
+class LazyParamsDict(ParamsDict):
+    """
+    ParamsDict freezing nested dicts and lists on first access. Until then they are kept as they are,
+    every read path (item and attribute access, get, items, values, iteration for ** and dict())
+    returns frozen values, so results are identical to an eagerly frozen tree.
+    Attributes are resolved by __getattr__, which is slower than attribute access of ParamsDict.
+    """
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)  # no __dict__ alias, it would expose unfrozen values
+
+    def __getitem__(self, key) -> Any:
+        value = dict.__getitem__(self, key)
+        if type(value) is dict or type(value) is list:
+            value = _freeze_lazy(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getattr__(self, key) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' has no param '{key}'", name=key, obj=self) from None
+
+    def get(self, key, default=None) -> Any:
+        return self[key] if dict.__contains__(self, key) else default
+
+    def _freeze_children(self) -> None:
+        for key, value in dict.items(self):
+            if type(value) is dict or type(value) is list:
+                dict.__setitem__(self, key, _freeze_lazy(value))
+
+    def __iter__(self):
+        return dict.__iter__(self)  # not inherited slot, so ** and dict() read items via __getitem__
+
+    def items(self):
+        self._freeze_children()
+        return dict.items(self)
+
+    def values(self):
+        self._freeze_children()
+        return dict.values(self)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __or__(self, other) -> Dict[str, Any]:
+        self._freeze_children()
+        return dict.__or__(self, other)
+
+    def __ror__(self, other) -> Dict[str, Any]:
+        self._freeze_children()
+        return dict.__ror__(self, other)
+
+
+class LazyParamsList(ParamsList):
+    """
+    ParamsList freezing nested dicts and lists on first access, see LazyParamsDict.
+    """
+
+    def _freeze_at(self, index: int) -> Any:
+        value = list.__getitem__(self, index)
+        if type(value) is dict or type(value) is list:
+            value = _freeze_lazy(value)
+            list.__setitem__(self, index, value)
+        return value
+
+    def __getitem__(self, index) -> Any:
+        if isinstance(index, slice):
+            return [self._freeze_at(i) for i in range(*index.indices(len(self)))]
+        return self._freeze_at(index)
+
+    def _freeze_all(self) -> None:
+        for i in range(len(self)):
+            self._freeze_at(i)
+
+    # list methods below read the storage directly, items are frozen before
+
+    def __iter__(self):
+        self._freeze_all()
+        return list.__iter__(self)
+
+    def __reversed__(self):
+        self._freeze_all()
+        return list.__reversed__(self)
+
+    def __contains__(self, value) -> bool:
+        self._freeze_all()
+        return list.__contains__(self, value)
+
+    def index(self, value, *args) -> int:
+        self._freeze_all()
+        return list.index(self, value, *args)
+
+    def count(self, value) -> int:
+        self._freeze_all()
+        return list.count(self, value)
+
+    def copy(self) -> List[Any]:
+        self._freeze_all()
+        return list.copy(self)
+
+    def __add__(self, other) -> List[Any]:
+        self._freeze_all()
+        return list.__add__(self, other)
+
+    def __radd__(self, other) -> List[Any]:
+        if not isinstance(other, list):
+            return NotImplemented
+        self._freeze_all()
+        return list.__add__(other, self)
+
+    def __mul__(self, n) -> List[Any]:
+        self._freeze_all()
+        return list.__mul__(self, n)
+
+    __rmul__ = __mul__
+
+
+def _freeze_lazy(params: Union[List[Any], Dict[str, Any]]) -> Union[LazyParamsDict, LazyParamsList]:
+    return LazyParamsDict(params) if type(params) is dict else LazyParamsList(params)
+
+
+_ARRAY_TYPECODES = {bool: 'b', int: 'q', float: 'd'}
+
+
+def _compact(params: List[Any]) -> Optional[ParamsArray]:
+    if len(params) < COMPACT_MIN_SIZE:
+        return None
+    typ = type(params[0])
+    typecode = _ARRAY_TYPECODES.get(typ)
+    if typecode is None or not all(type(value) is typ for value in params):
+        return None
+    try:
+        return ParamsArray(array(typecode, params), typ is bool)
+    except OverflowError:  # ints out of 64-bit range
+        return None
+
+
+_FROZEN = (ParamsDict, ParamsList, ParamsArray)
+
+
+def freeze(params: Union[List[Any], Dict[str, Any]],
+           compact: bool = False, lazy: bool = False, index: bool = False) -> Union[ParamsList, ParamsDict, ParamsArray]:
     """
     Recursively freeze dictionaries and list making them read-only. Frozen dict provides attribute-style access.
+    Nested dicts and lists are replaced with their frozen copies in place, so each source node can be released
+    as soon as it is frozen. Already frozen subtrees are shared with the result, not copied.
     :param params: parameters as python dict and list tree
+    :param compact: store homogeneous int, float and bool lists of at least COMPACT_MIN_SIZE values as ParamsArray
+    :param lazy: freeze nested dicts and lists on first access, see LazyParamsDict, can not be combined with compact
+    :param index: build flat index of nested params shared by all dicts of the tree, see IndexedParamsDict
     :return: frozen parameters
     """
+    if lazy:
+        if compact or index:
+            raise ValueError('lazy freeze can not be combined with compact or index')
+        if isinstance(params, _FROZEN):
+            return params
+        return _freeze_lazy(params)
+    if index:
+        if isinstance(params, IndexedParamsDict):
+            return params
+        return _freeze_indexed(params, '', {}, compact)
+    if isinstance(params, _FROZEN):
+        return params
     if isinstance(params, dict):
         for key, value in params.items():
-            if isinstance(value, dict) or isinstance(value, list):
-                params[key] = freeze(value)
+            if isinstance(value, (dict, list)) and not isinstance(value, _FROZEN):
+                params[key] = freeze(value, compact)
         return ParamsDict(params)
     else:
+        if compact:
+            compacted = _compact(params)
+            if compacted is not None:
+                return compacted
         for i in range(len(params)):
             value = params[i]
-            if isinstance(value, dict) or isinstance(value, list):
-                params[i] = freeze(value)
+            if isinstance(value, (dict, list)) and not isinstance(value, _FROZEN):
+                params[i] = freeze(value, compact)
         return ParamsList(params)
 
 
-def unfreeze(params: Union[ParamsList, ParamsDict]) -> Union[List[Any], Dict[str, Any]]:
+def share_unchanged(params: Any, previous: Any) -> Any:
+    """
+    Replace subtrees of frozen params with equal subtrees of previous frozen params at the same path.
+    Unchanged parts of a re-built tree then keep their identity, and so does the whole tree if nothing changed.
+    :param params: frozen parameters
+    :param previous: previous version of frozen parameters
+    :return: frozen parameters sharing unchanged subtrees with previous
+    """
+    if params is previous:
+        return params
+    if isinstance(params, ParamsDict) and isinstance(previous, ParamsDict):
+        shared = {}
+        reused = False
+        same = len(params) == len(previous)
+        for key, value in params.items():
+            if key in previous:
+                previous_value = previous[key]
+                value = share_unchanged(value, previous_value)
+                if value is previous_value:
+                    reused = True
+                else:
+                    same = False
+            else:
+                same = False
+            shared[key] = value
+        if same:
+            return previous
+        return ParamsDict(shared) if reused else params
+    if isinstance(params, ParamsList) and isinstance(previous, ParamsList) and len(params) == len(previous):
+        items = [share_unchanged(value, previous_value) for value, previous_value in zip(params, previous)]
+        reused = [value is previous_value for value, previous_value in zip(items, previous)]
+        if all(reused):
+            return previous
+        return ParamsList(items) if any(reused) else params
+    if type(params) is type(previous) and params == previous:
+        return previous
+    return params
+
+
+def unfreeze(params: Union[ParamsList, ParamsDict, ParamsArray]) -> Union[List[Any], Dict[str, Any]]:
     """
     Recursively unfreeze tree of frozen dicts and lists.
     Useful for serialization, where deserialization of immutable dict or list may fail.
+    Each node is copied once, leaf values are shared with the frozen tree. ParamsArray becomes a list.
     :param params: frozen parameters tree
     :return: parameters as dict and list tree
     """
     if isinstance(params, dict):
-        params = dict(params)
-        for key, value in params.items():
-            if isinstance(value, ParamsDict) or isinstance(value, ParamsList):
-                params[key] = unfreeze(value)
-        return params
+        return {key: unfreeze(value) if isinstance(value, _FROZEN) else value
+                for key, value in params.items()}
     else:
-        params = list(params)
-        for i in range(len(params)):
-            value = params[i]
-            if isinstance(value, ParamsDict) or isinstance(value, ParamsList):
-                params[i] = unfreeze(value)
-        return params
+        return [unfreeze(value) if isinstance(value, _FROZEN) else value
+                for value in params]
@@ -0,0 +1,46 @@
+import logging
+from typing import List, Optional
+
+from paramflow.frozen import freeze, share_unchanged, ParamsDict
+from paramflow.params import activate_profile, merge_shared
+from paramflow.parser import EXTENDS_KEY, Parser
+
+logger = logging.getLogger(__name__)
+
+
+class Layers:
+    """
+    Incremental merge of parser layers. Merged params after every layer are kept as frozen trees
+    sharing unchanged subtrees with each other, so re-parsing from layer k re-merges only layers k..n.
+    """
+
+    def __init__(self, parsers: List[Parser], default_profile: str, target_profile: Optional[str],
+                 compact: bool = False, extends_key: str = EXTENDS_KEY):
+        self.parsers = list(parsers)
+        self.default_profile = default_profile
+        self.target_profile = target_profile
+        self.compact = compact
+        self.extends_key = extends_key
+        self.params: Optional[ParamsDict] = None
+        self._merged: List[ParamsDict] = []
+
+    def parse(self, start: int = 0) -> ParamsDict:
+        """
+        Re-run parsers from layer start on top of the kept merge result of preceding layers and activate profile.
+        Subtrees equal to the previous result are shared with it.
+        :param start: index of the first layer to re-run
+        :return: read-only parameters as frozen dict
+        """
+        del self._merged[start:]
+        params = self._merged[-1] if self._merged else ParamsDict()
+        for i in range(len(self._merged), len(self.parsers)):
+            logger.debug('Merging params layer %d', i)
+            parser = self.parsers[i]
+            params = freeze(merge_shared(params, parser(params)), self.compact)
+            self._merged.append(params)
+        params = freeze(activate_profile(params, self.default_profile, self.target_profile,
+                                         extends_key=self.extends_key), self.compact)
+        if self.params is not None:
+            params = share_unchanged(params, self.params)
+        self.params = params
+        return params
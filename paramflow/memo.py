@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Iterable, List, Optional, Tuple
+
+from paramflow.frozen import ParamsDict
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def make_key(sources: tuple, env_prefixes: Iterable[Optional[str]], options: tuple) -> tuple:
+    """
+    Build fingerprint of a load call from its arguments, relevant env vars and command-line arguments.
+    :param sources: sources passed to load
+    :param env_prefixes: prefixes of env vars which affect the result
+    :param options: remaining load arguments
+    :return: hashable key
+    """
+    prefixes = tuple(p for p in env_prefixes if p is not None)
+    env = tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith(prefixes)))
+    return repr(sources), options, tuple(sys.argv), env
+
+
+class LoadCache:
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[ParamsDict]:
+        """
+        Return cached params if all files they were loaded from are unchanged.
+        Restores command-line arguments to the state after the cached load consumed meta arguments.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                params, files, argv = entry
+                if all(_file_stat(path) == stat for path, stat in files):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    sys.argv = list(argv)
+                    return params
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, params: ParamsDict, files: List[str]) -> None:
+        entry = params, [(path, _file_stat(path)) for path in files], tuple(sys.argv)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._trim()
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self._trim()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+load_cache = LoadCache()
+
+
+def cache_clear() -> None:
+    """
+    Drop all memoized load results and reset hit/miss counters.
+    """
+    load_cache.clear()
+
+
+def cache_info() -> CacheInfo:
+    """
+    Statistics of memoized load results.
+    :return: hits, misses, maxsize and current size
+    """
+    return load_cache.info()
+
+
+def cache_resize(maxsize: int) -> None:
+    """
+    Set maximum number of memoized load results, least recently used ones are evicted first.
+    :param maxsize: maximum number of entries
+    """
+    load_cache.resize(maxsize)
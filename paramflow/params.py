@@ -1,10 +1,19 @@
 import logging
+import os
 import sys
-from typing import Any, List, Dict, Optional, Final
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterable, List, Dict, Optional, Final, Tuple, TYPE_CHECKING
 
-from paramflow.convert import convert_type
+from paramflow.convert import ConversionError, ConversionPlan, convert_type
 from paramflow.frozen import freeze, ParamsDict
-from paramflow.parser import PARSER_MAP, EnvParser, ArgsParser, DotEnvParser, Parser, DictParser
+from paramflow.memo import load_cache, make_key
+from paramflow.stats import Stage, StageCallback, count_keys, run_stage
+from paramflow.parser import PARSER_MAP, EXTENDS_KEY, EnvIndex, EnvParser, ArgsParser, DotEnvParser, Parser, DictParser, \
+    FileParser, DeferredSection
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +27,15 @@ def load(*sources: str | dict,
          env_prefix: str = 'P_',
          args_prefix: str = '',
          profile_key: str = 'profile',
+         extends_key: str = EXTENDS_KEY,
          default_profile: str = 'default',
-         profile: Optional[str] = None) -> ParamsDict:
+         profile: Optional[str] = None,
+         cache_dir: Optional[str] = None,
+         memoize: bool = False,
+         compact: bool = False,
+         lazy: bool = False,
+         index: bool = False,
+         on_stage: Optional[StageCallback] = None) -> ParamsDict:
     """
     Load parameters form multiple sources, layer them on top of each other and activate profile.
     Activation of profile means layering it on top of the default profile.
@@ -29,11 +45,206 @@ def load(*sources: str | dict,
     :param env_prefix: prefix for env vars that are used to overwrite params, if None disable auto adding env source
     :param args_prefix: prefix for command-line arguments, if None disable auto adding args source
     :param profile_key: parameter name for the profile
+    :param extends_key: key of profile sections listing profiles they extend
     :param default_profile: default profile
     :param profile: profile to activate
+    :param cache_dir: directory for caching parsed source files, if None caching is disabled
+    :param memoize: return the same params for repeated calls with unchanged arguments, env vars,
+                    command-line arguments and source files, see cache_clear and cache_info
+    :param compact: store large homogeneous numeric lists as read-only ParamsArray, see freeze
+    :param lazy: freeze nested sections on first access, see LazyParamsDict
+    :param index: build flat index of nested params for lookups by path, see IndexedParamsDict
+    :param on_stage: callback called with timing of every load stage, e.g. LoadStats
+    :return: read-only parameters as frozen dict
+    """
+
+    validate_load_args(sources, profile_key, default_profile, extends_key)
+
+    if memoize:
+        options = (meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                   profile_key, extends_key, default_profile, profile, cache_dir, compact, lazy, index)
+        key = make_key(sources, (meta_env_prefix, env_prefix), options)
+        params = load_cache.get(key)
+        if params is not None:
+            return params
+
+    env = EnvIndex(os.environ)
+    meta_args = (sources, meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                 profile_key, default_profile, profile, env, extends_key)
+    if on_stage is None:
+        meta = load_meta(*meta_args)
+    else:
+        meta = run_stage(on_stage, 'meta', None, load_meta, *meta_args)
+    sources = resolve_sources(meta)
+    parsers = build_parsers(sources, meta, cache_dir, env, defer_sections=True)
+
+    params = parse(parsers, meta.default_profile, meta.profile, compact, on_stage, lazy, index,
+                   extends_key=meta.extends_key)
+    if memoize:
+        load_cache.put(key, params, file_sources(sources))
+    return params
+
+
+async def load_async(*sources: str | dict,
+                     meta_env_prefix: str = 'P_',
+                     meta_args_prefix: str = '',
+                     env_prefix: str = 'P_',
+                     args_prefix: str = '',
+                     profile_key: str = 'profile',
+                     extends_key: str = EXTENDS_KEY,
+                     default_profile: str = 'default',
+                     profile: Optional[str] = None,
+                     cache_dir: Optional[str] = None,
+                     memoize: bool = False,
+                     compact: bool = False,
+                     lazy: bool = False,
+                     index: bool = False,
+                     on_stage: Optional[StageCallback] = None,
+                     executor: Optional['Executor'] = None) -> ParamsDict:
+    """
+    Load parameters like load without blocking the event loop, it takes the same arguments as load.
+    All file sources are read and parsed concurrently in the executor, then layers are merged in the declared order,
+    so the result is the same as of load. Env vars, .env files and command-line arguments are layered in the merge,
+    they depend on layers before them.
+    :param on_stage: callback called with timing of every load stage like in load, parse stages of files are reported
+                     as the files are parsed, their durations overlap and include waiting for the executor
+    :param executor: executor for reading and parsing files, e.g. ProcessPoolExecutor for parsing in worker processes,
+                     if None the default executor of the event loop is used, layers are merged in the default executor
     :return: read-only parameters as frozen dict
     """
+    import asyncio
+    validate_load_args(sources, profile_key, default_profile, extends_key)
+
+    if memoize:
+        options = (meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                   profile_key, extends_key, default_profile, profile, cache_dir, compact, lazy, index)
+        key = make_key(sources, (meta_env_prefix, env_prefix), options)
+        params = load_cache.get(key)
+        if params is not None:
+            return params
+
+    loop = asyncio.get_running_loop()
+    env = EnvIndex(os.environ)
+    meta_args = (sources, meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                 profile_key, default_profile, profile, env, extends_key)
+    if on_stage is None:
+        meta = load_meta(*meta_args)
+    else:
+        meta = run_stage(on_stage, 'meta', None, load_meta, *meta_args)
+    sources = resolve_sources(meta)
+    parsers = build_parsers(sources, meta, cache_dir, env)
+
+    async def parse_file(parser: FileParser) -> Dict[str, Any]:
+        if on_stage is None:
+            return await loop.run_in_executor(executor, parser)
+        start = time.perf_counter()
+        layer = await loop.run_in_executor(executor, parser)
+        on_stage(Stage('parse', parser.source, start, time.perf_counter() - start, None, count_keys(layer)))
+        return layer
+
+    files = [(i, parser) for i, parser in enumerate(parsers) if isinstance(parser, FileParser)]
+    results = await asyncio.gather(*(parse_file(parser) for _, parser in files))
+    for (i, parser), result in zip(files, results):
+        parsers[i] = ParsedParser(parser.source, result)
+    # merge reads sys.argv and env, it runs in a thread of this process even with a process pool executor
+    params = await loop.run_in_executor(None, parse, parsers, meta.default_profile, meta.profile,
+                                        compact, on_stage, lazy, index, True, meta.extends_key)
+    if memoize:
+        load_cache.put(key, params, file_sources(sources))
+    return params
+
+
+class ParsedParser(Parser):
+    """
+    Layer parsed in advance, e.g. concurrently with other layers.
+    """
+
+    def __init__(self, source: str, params: Dict[str, Any]):
+        self.source = source
+        self.params = params
 
+    def __call__(self, *args) -> Dict[str, Any]:
+        return self.params
+
+
+def load_profiles(*sources: str | dict,
+                  profiles: Optional[List[str]] = None,
+                  meta_env_prefix: str = 'P_',
+                  meta_args_prefix: str = '',
+                  env_prefix: str = 'P_',
+                  args_prefix: str = '',
+                  profile_key: str = 'profile',
+                  extends_key: str = EXTENDS_KEY,
+                  default_profile: str = 'default',
+                  cache_dir: Optional[str] = None,
+                  compact: bool = False) -> Dict[str, ParamsDict]:
+    """
+    Load parameters like load, activating every profile. Sources are parsed and merged once,
+    subtrees not changed by a profile are shared by all activated profiles.
+    Env vars and command-line arguments are layered on top of every activated profile like in load.
+    :param sources: file or multiple files to load parameters from
+    :param profiles: profiles to activate, if None all profiles including the default one
+    :return: read-only parameters as frozen dict by profile name
+    """
+    validate_load_args(sources, profile_key, default_profile, extends_key)
+    env = EnvIndex(os.environ)
+    meta = load_meta(sources, meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                     profile_key, default_profile, None, env, extends_key)
+    parsers = build_parsers(resolve_sources(meta), meta, cache_dir, env)
+    return activate_profiles(parsers, meta.default_profile, profiles, compact, meta.extends_key)
+
+
+def activate_profiles(parsers: List[Parser], default_profile: str, profiles: Optional[List[str]],
+                      compact: bool = False, extends_key: str = EXTENDS_KEY) -> Dict[str, ParamsDict]:
+    """
+    Merge file layers once, then activate every profile and layer env vars and command-line arguments on top.
+    :return: frozen params by profile name
+    """
+    params = {}
+    overrides = []
+    for parser in parsers:
+        layer = parser(params)
+        if isinstance(parser, (EnvParser, ArgsParser, DotEnvParser)):
+            if layer:
+                overrides.append(override_params(layer, parser.target_profile, default_profile, params))
+        else:
+            params = deep_merge(params, layer)
+    params = freeze(params, compact)
+    if profiles is None:
+        profiles = profile_names(params, default_profile)
+    result = {}
+    resolver = ProfileResolver(params, default_profile, extends_key) if default_profile in params else None
+    for profile in profiles:
+        profile_params = activate_profile(params, default_profile, profile, resolver, extends_key)
+        for override in overrides:
+            profile_params = merge_shared(profile_params, override)
+        result[profile] = freeze(profile_params, compact)
+    return result
+
+
+def override_params(layer: Dict[str, Any], target_profile: Optional[str], default_profile: str,
+                    params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    :return: params of an env or args layer without the profile section they were parsed into
+    """
+    if target_profile is None and default_profile in params:
+        target_profile = default_profile
+    if target_profile is None:
+        return layer
+    return {**layer[target_profile], '__source__': layer['__source__']}
+
+
+def profile_names(params: Dict[str, Any], default_profile: str) -> List[str]:
+    """
+    :return: default profile followed by all other profiles, only default profile if profiles are disabled
+    """
+    if default_profile not in params:
+        return [default_profile]
+    return [default_profile, *(k for k in params if not k.startswith('__') and k != default_profile)]
+
+
+def validate_load_args(sources: tuple, profile_key: str, default_profile: str,
+                       extends_key: str = EXTENDS_KEY) -> None:
     for source in sources:
         if not isinstance(source, (str, dict)):
             raise TypeError(f"sources must be file paths or dicts, got {type(source).__name__}")
@@ -41,102 +252,379 @@ def load(*sources: str | dict,
         raise ValueError("default_profile must be a non-empty string")
     if not profile_key:
         raise ValueError("profile_key must be a non-empty string")
+    if not extends_key:
+        raise ValueError("extends_key must be a non-empty string")
+
 
+def load_meta(sources: tuple, meta_env_prefix: str, meta_args_prefix: str, env_prefix: str, args_prefix: str,
+              profile_key: str, default_profile: str, profile: Optional[str], env: EnvIndex,
+              extends_key: str = EXTENDS_KEY) -> ParamsDict:
+    """
+    Layer meta params: load arguments, env vars and command-line arguments. Meta command-line arguments are consumed.
+    :return: frozen meta params
+    """
     logger.debug('Reading meta params layer %d, source: %s', 0, 'pf.load')
     meta = {
         'sources': sources,
         'env_prefix': env_prefix,
         'args_prefix': args_prefix,
         'profile_key': profile_key,
+        'extends_key': extends_key,
         'default_profile': default_profile,
         profile_key: profile,
         '__source__': ['pf.load'],
     }
     logger.debug('Reading meta params layer %d, source: %s', 1, 'env')
-    meta_env_parser = EnvParser(meta_env_prefix, 'default')
+    plan = ConversionPlan()
+    meta_env_parser = EnvParser(meta_env_prefix, 'default', env=env, plan=plan)
     logger.debug('Reading meta params layer %d, source: %s', 2, 'args')
     meta_args_parser = ArgsParser(meta_args_prefix, 'default',
-                                  no_exit=True, consume_args=True, descr='Meta-parameters')
+                                  no_exit=True, consume_args=True, descr='Meta-parameters', plan=plan)
     meta = deep_merge(meta, meta_env_parser(meta))
     meta = deep_merge(meta, meta_args_parser(meta))
-    meta = freeze(meta)
+    return freeze(meta)
 
-    sources = list(meta.sources) if meta.sources else []
 
+def resolve_sources(meta: ParamsDict) -> List[str | dict]:
+    """
+    :return: sources from meta params with env and args sources appended unless disabled or listed explicitly
+    """
+    sources = list(meta.sources) if meta.sources else []
     if ENV_SOURCE not in sources and meta.env_prefix is not None:
         sources.append(ENV_SOURCE)
     if ARGS_SOURCE not in sources and meta.args_prefix is not None:
         sources.append(ARGS_SOURCE)
-    parsers = build_parsers(sources, meta)
+    return sources
 
-    return parse(parsers, meta.default_profile, meta.profile)
 
+def file_sources(sources: List[str | dict]) -> List[str]:
+    return [s for s in sources if isinstance(s, str) and s not in (ENV_SOURCE, ARGS_SOURCE)]
 
-def parse(parsers: List[Parser], default_profile: str, target_profile: str):
+
+def parse(parsers: List[Parser], default_profile: str, target_profile: str, compact: bool = False,
+          on_stage: Optional[StageCallback] = None, lazy: bool = False, index: bool = False,
+          select_profiles: bool = True, extends_key: str = EXTENDS_KEY):
+    """
+    Merge layers, activate profile and freeze the result.
+    :param select_profiles: merge only sections used by the activated profile, see ProfileSelector
+    :param extends_key: key of profile sections listing profiles they extend
+    """
     params = {}
+    selector = ProfileSelector(default_profile, target_profile, extends_key) if select_profiles else None
+    if on_stage is None:
+        for parser in parsers:
+            layer = parser(params)
+            if selector is not None:
+                params, layer = selector.select(params, layer)
+            params = deep_merge(params, layer)
+        resolver = _selected_resolver(params, default_profile, selector, extends_key)
+        params = activate_profile(params, default_profile, target_profile, resolver, extends_key)
+        return freeze(params, compact, lazy, index)
     for parser in parsers:
-        params = deep_merge(params, parser(params))
-    params = activate_profile(params, default_profile, target_profile)
-    return freeze(params)
+        if type(parser) is ParsedParser:  # parse stage reported when it was parsed
+            layer = parser(params)
+        else:
+            layer = run_stage(on_stage, 'parse', parser.source, parser, params)
+        if selector is not None:
+            params, layer = selector.select(params, layer)
+        params = run_stage(on_stage, 'deep_merge', parser.source, deep_merge, params, layer)
+    resolver = _selected_resolver(params, default_profile, selector, extends_key)
+    params = run_stage(on_stage, 'activate_profile', target_profile, activate_profile,
+                       params, default_profile, target_profile, resolver, extends_key)
+    return run_stage(on_stage, 'freeze', None, freeze, params, compact, lazy, index)
+
+
+def _selected_resolver(params: Dict[str, Any], default_profile: str, selector: Optional['ProfileSelector'],
+                       extends_key: str) -> Optional['ProfileResolver']:
+    # profiles set aside by the selector are listed in errors for missing profiles, like in ProfileSelector.check
+    if selector is None:
+        return None
+    selector.check(params)
+    if default_profile not in params:
+        return None
+    return ProfileResolver(params, default_profile, extends_key, selector.unused)
 
 
-def build_parsers(sources: List[str], meta: ParamsDict):
+def _parents(profile: str, extends: Any, extends_key: str) -> List[str]:
+    # profiles extended by profile, extends is a name or a list of names
+    if isinstance(extends, str):
+        return [extends]
+    if isinstance(extends, (list, tuple)) and all(isinstance(parent, str) for parent in extends):
+        return list(extends)
+    raise ValueError(f"profile '{profile}': '{extends_key}' must be a profile name or a list of profile names, "
+                     f"got {extends!r}")
+
+
+class ProfileSelector:
+    """
+    Select top-level sections of layers used by the activated profile: the default profile, the target profile,
+    profiles they extend and metadata. Other sections are set aside without merging, they are merged later
+    only if a used profile turns out to extend them, so the result does not change.
+    Layers are selected once some layer had the default profile section, before that profiles may be disabled.
+    """
+
+    def __init__(self, default_profile: str, target_profile: Optional[str], extends_key: str = EXTENDS_KEY):
+        self.default_profile = default_profile
+        self.extends_key = extends_key
+        self.target_profile = target_profile if target_profile is not None else default_profile
+        self.needed = {default_profile, self.target_profile}
+        self.enabled = False
+        self.unused: Dict[Any, List[Any]] = {}  # set aside sections in layer order
+
+    def select(self, params: Dict[str, Any], layer: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        :param params: params merged so far
+        :param layer: next layer
+        :return: params with set aside sections that became used merged in, and selected sections of layer
+        """
+        if not self.enabled:
+            if self.default_profile not in layer:
+                return params, layer
+            self.enabled = True
+        selected = {}
+        for key, value in layer.items():
+            if key in self.needed or (type(key) is str and key.startswith('__')):
+                selected[key] = value.build() if type(value) is DeferredSection else value
+            else:
+                self.unused.setdefault(key, []).append(value)
+        for name in self._extended(params, selected):
+            for value in self.unused.pop(name, ()):
+                params = deep_merge(params, {name: value.build() if type(value) is DeferredSection else value})
+        return params, selected
+
+    def _extended(self, params: Dict[str, Any], selected: Dict[str, Any]) -> List[Any]:
+        # profiles extended by needed profiles, transitively, declared in any layer seen so far
+        added = []
+        pending = list(self.needed)
+        while pending:
+            name = pending.pop()
+            sections = [params.get(name), selected.get(name), *self.unused.get(name, ())]
+            for section in sections:
+                if type(section) is DeferredSection:
+                    extends = section.extends
+                elif isinstance(section, dict):
+                    extends = section.get(self.extends_key)
+                else:
+                    continue
+                for parent in _parents(name, extends, self.extends_key) if extends is not None else ():
+                    if parent not in self.needed:
+                        self.needed.add(parent)
+                        added.append(parent)
+                        pending.append(parent)
+        return added
+
+    def check(self, params: Dict[str, Any]) -> None:
+        """
+        Raise error for a missing target profile listing all profiles, including the ones set aside.
+        """
+        if self.enabled and self.target_profile not in params:
+            available = [k for k in params if not k.startswith('__') and k != self.default_profile]
+            available += [k for k in self.unused if k not in params]
+            raise ValueError(f"profile '{self.target_profile}' not found, available profiles: {available}")
+
+
+def build_parsers(sources: List[str], meta: ParamsDict, cache_dir: Optional[str] = None, env: EnvIndex = None,
+                  defer_sections: bool = False):
+    """
+    :param defer_sections: let file parsers build top-level sections other than the default profile on demand,
+                           the result must be merged by parse with selected profiles
+    """
     parsers = []
+    plan = ConversionPlan()  # shared by consecutive override layers, file layers change the reference params
     for i, source in enumerate(sources):
         logger.debug('Reading params layer %d, source: %s', i, source)
         if isinstance(source, dict):
             parser = DictParser(source)
+            plan = ConversionPlan()
         elif source == ARGS_SOURCE:
-            parser = ArgsParser(meta.args_prefix, meta.default_profile, meta.profile, descr='Parameters')
+            parser = ArgsParser(meta.args_prefix, meta.default_profile, meta.profile, descr='Parameters', plan=plan)
         elif source == ENV_SOURCE:
-            parser = EnvParser(meta.env_prefix, meta.default_profile, meta.profile)
+            parser = EnvParser(meta.env_prefix, meta.default_profile, meta.profile, env, plan)
         elif source.endswith('.env'):
-            parser = DotEnvParser(source, meta.env_prefix, meta.default_profile, meta.profile)
+            parser = DotEnvParser(source, meta.env_prefix, meta.default_profile, meta.profile, plan)
         else:
+            plan = ConversionPlan()
             ext = source.split('.')[-1]
             try:
                 parser_class = PARSER_MAP[ext]
             except KeyError:
                 raise ValueError(f"unsupported file format '.{ext}' in '{source}'")
-            parser = parser_class(source)
+            parser = parser_class(source, cache_dir, meta.default_profile if defer_sections else None,
+                                  meta.get('extends_key', EXTENDS_KEY))
         parsers.append(parser)
     return parsers
 
 
-def activate_profile(params: Dict[str, Any], default_profile: str, profile: str) -> Dict[str, Any]:
-    profile_params = params.get(default_profile)
-    if profile_params is None:
-        profile_params = dict(params)  # profiles disabled
-    else:
-        profile_params = dict(profile_params)
+def activate_profile(params: Dict[str, Any], default_profile: str, profile: str,
+                     resolver: Optional['ProfileResolver'] = None, extends_key: str = EXTENDS_KEY) -> Dict[str, Any]:
+    """
+    Layer profile on top of the profiles it extends and the default profile.
+    :param resolver: resolver memoizing profiles extended by many activated profiles, see ProfileResolver
+    :param extends_key: key of profile sections listing profiles they extend, not used with resolver
+    """
+    if default_profile not in params:  # profiles disabled
+        profile_params = dict(params)
+        if '__source__' in params:
+            profile_params['__source__'] = params['__source__']
+        profile_params['__profile__'] = [default_profile]
+        if profile is not None and profile != default_profile:
+            if profile not in params:
+                available = [k for k in params if not k.startswith('__')]
+                raise ValueError(f"profile '{profile}' not found, available profiles: {available}")
+            profile_params = merge_shared(profile_params, params[profile])
+            profile_params['__profile__'].append(profile)
+        return profile_params
+    if resolver is None:
+        resolver = ProfileResolver(params, default_profile, extends_key)
+    chain, profile_params = resolver.resolve(profile if profile is not None else default_profile)
+    profile_params = dict(profile_params)
     if '__source__' in params:
         profile_params['__source__'] = params['__source__']
-    profile_params['__profile__'] = [default_profile]
-    if profile is not None and profile != default_profile:
-        if profile not in params:
-            available = [k for k in params if not k.startswith('__') and k != default_profile]
-            raise ValueError(f"profile '{profile}' not found, available profiles: {available}")
-        active_profile_params = params[profile]
-        deep_merge(profile_params, active_profile_params)
-        profile_params['__profile__'].append(profile)
+    profile_params['__profile__'] = list(chain)
     return profile_params
 
 
+class ProfileResolver:
+    """
+    Resolve profiles extending other profiles. A profile lists profiles it extends in the extends key,
+    as a name or a list of names, all profiles extend the default profile. Resolved profiles are memoized,
+    so a profile extended by many activated profiles is merged only once.
+    """
+
+    def __init__(self, params: Dict[str, Any], default_profile: str, extends_key: str = EXTENDS_KEY,
+                 unused: Iterable[str] = ()):
+        """
+        :param unused: names of profiles set aside by ProfileSelector, listed as available in errors
+        """
+        self.params = params
+        self.default_profile = default_profile
+        self.extends_key = extends_key
+        self.unused = [name for name in unused if name not in params]
+        default = params[default_profile]
+        if isinstance(default, dict) and extends_key in default:
+            raise ValueError(f"default profile '{default_profile}' can not extend other profiles")
+        self._resolved: Dict[str, Tuple[List[str], Dict[str, Any]]] = {default_profile: ([default_profile], default)}
+
+    def resolve(self, profile: str) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        :return: chain of profiles in merge order ending with profile, and merged params of the chain
+        """
+        return self._resolve(profile, [])
+
+    def _resolve(self, profile: str, visiting: List[str]) -> Tuple[List[str], Dict[str, Any]]:
+        resolved = self._resolved.get(profile)
+        if resolved is not None:
+            return resolved
+        if profile in visiting:
+            cycle = ' -> '.join(visiting[visiting.index(profile):] + [profile])
+            raise ValueError(f"profile inheritance cycle: {cycle}")
+        section = self.params.get(profile)
+        if section is None or profile.startswith('__'):
+            available = [k for k in self.params if not k.startswith('__') and k != self.default_profile]
+            available += self.unused
+            extended_by = f" extended by '{visiting[-1]}'" if visiting else ''
+            raise ValueError(f"profile '{profile}'{extended_by} not found, available profiles: {available}")
+        extends = section.get(self.extends_key, self.default_profile) if isinstance(section, dict) else self.default_profile
+        extends = _parents(profile, extends, self.extends_key)
+        visiting.append(profile)
+        parents = [self._resolve(parent, visiting) for parent in extends]
+        visiting.pop()
+        # first parent's chain is the prefix, profiles from other parents not in it yet are merged in their order
+        chain, merged = parents[0] if parents else self._resolved[self.default_profile]
+        chain = list(chain)
+        for parent_chain, _ in parents[1:]:
+            for name in parent_chain:
+                if name not in chain:
+                    chain.append(name)
+                    merged = merge_shared(merged, self._section(name))
+        chain.append(profile)
+        merged = merge_shared(merged, self._section(profile))
+        self._resolved[profile] = chain, merged
+        return chain, merged
+
+    def _section(self, profile: str) -> Dict[str, Any]:
+        section = self.params[profile]
+        if isinstance(section, dict) and self.extends_key in section:
+            return {k: v for k, v in section.items() if k != self.extends_key}
+        return section
+
+
 def deep_merge(dst: dict, src: dict, path: str = '') -> dict:
+    try:
+        return _deep_merge(dst, src)
+    except ConversionError as e:
+        e.path = path + e.path
+        raise
+
+
+def _deep_merge(dst: dict, src: dict) -> dict:
+    # paths of conversion errors are built while the error propagates, see ConversionError
     for src_key, src_value in src.items():
-        if src_key == '__source__':
-            if not src_key in dst:
-                dst[src_key] = []
-            dst[src_key].extend(src_value)
-        elif isinstance(src_value, dict) and isinstance(dst.get(src_key), dict) and len(src_value) > 0:
-            deep_merge(dst[src_key], src_value, f'{path}.{src_key}')
-        elif isinstance(src_value, list) and isinstance(dst.get(src_key), list) and len(src_value) == len(dst[src_key]):
-            for i in range(len(src_value)):
-                current_path = f'{path}.{src_key}[{i}]'
-                if isinstance(src_value[i], dict) and isinstance(dst[src_key][i], dict):
-                    deep_merge(dst[src_key][i], src_value[i], current_path)
-                else:
-                    dst[src_key][i] = convert_type(dst[src_key][i], src_value[i], current_path)
-        else:
-            dst[src_key] = convert_type(dst.get(src_key), src_value, f'{path}.{src_key}')
+        try:
+            if src_key == '__source__':
+                if not src_key in dst:
+                    dst[src_key] = []
+                dst[src_key].extend(src_value)
+            elif isinstance(src_value, dict) and isinstance(dst.get(src_key), dict) and len(src_value) > 0:
+                _deep_merge(dst[src_key], src_value)
+            elif isinstance(src_value, list) and isinstance(dst.get(src_key), list) and len(src_value) == len(dst[src_key]):
+                for i in range(len(src_value)):
+                    try:
+                        if isinstance(src_value[i], dict) and isinstance(dst[src_key][i], dict):
+                            _deep_merge(dst[src_key][i], src_value[i])
+                        else:
+                            dst[src_key][i] = convert_type(dst[src_key][i], src_value[i])
+                    except ConversionError as e:
+                        raise e.at(i)
+            else:
+                dst[src_key] = convert_type(dst.get(src_key), src_value)
+        except ConversionError as e:
+            raise e.at(src_key)
     return dst
+
+
+def _is_list(value: Any) -> bool:
+    return isinstance(value, list) or isinstance(value, Sequence) and not isinstance(value, (str, bytes, tuple))
+
+
+def merge_shared(dst: Dict[str, Any], src: Dict[str, Any], path: str = '') -> Dict[str, Any]:
+    """
+    Merge src into dst like deep_merge, but without mutating dst. Dicts and lists on merged paths are copied,
+    all other subtrees of dst are shared with the result, so dst may be a frozen tree or a view of compiled params.
+    :param dst: params to merge into
+    :param src: params to merge
+    :param path: path of dst used in conversion errors
+    :return: merged params
+    """
+    try:
+        return _merge_shared(dst, src)
+    except ConversionError as e:
+        e.path = path + e.path
+        raise
+
+
+def _merge_shared(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(dst) if isinstance(dst, dict) else dict(dst.items())  # views read items in one pass
+    for src_key, src_value in src.items():
+        dst_value = merged.get(src_key)
+        try:
+            if src_key == '__source__':
+                merged[src_key] = [*dst_value, *src_value] if dst_value is not None else list(src_value)
+            elif isinstance(src_value, dict) and isinstance(dst_value, Mapping) and len(src_value) > 0:
+                merged[src_key] = _merge_shared(dst_value, src_value)
+            elif isinstance(src_value, list) and _is_list(dst_value) and len(src_value) == len(dst_value):
+                items = list(dst_value)
+                for i in range(len(src_value)):
+                    try:
+                        if isinstance(src_value[i], dict) and isinstance(items[i], Mapping):
+                            items[i] = _merge_shared(items[i], src_value[i])
+                        else:
+                            items[i] = convert_type(items[i], src_value[i])
+                    except ConversionError as e:
+                        raise e.at(i)
+                merged[src_key] = items
+            else:
+                merged[src_key] = convert_type(dst_value, src_value)
+        except ConversionError as e:
+            raise e.at(src_key)
+    return merged
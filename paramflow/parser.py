@@ -1,18 +1,19 @@
 import argparse
-import configparser
 import copy
+import functools
 import json
 import os
 import sys
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Final, Type, cast
+from typing import Any, Callable, Dict, Final, List, Mapping, Optional, Tuple, Type, Union
 
-import yaml
-
-from paramflow.convert import infer_type
+from paramflow.convert import ConversionPlan, infer_type
 
 _MISSING = object()
 
+# key of profile sections listing profiles they extend
+EXTENDS_KEY: Final[str] = 'extends'
+
 
 def _set_nested(d: Dict[str, Any], keys: list, value: Any) -> None:
     for key in keys[:-1]:
@@ -20,12 +21,13 @@ def _set_nested(d: Dict[str, Any], keys: list, value: Any) -> None:
     d[keys[-1]] = value
 
 
-def _flatten_params(params: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
-    result = {}
+def _flatten_params(params: Dict[str, Any], prefix: str = '', result: Dict[str, Any] = None) -> Dict[str, Any]:
+    if result is None:
+        result = {}
     for key, value in params.items():
         full_key = f'{prefix}__{key}' if prefix else key
-        if isinstance(value, dict):
-            result.update(_flatten_params(value, full_key))
+        if isinstance(value, Mapping):
+            _flatten_params(value, full_key, result)
         else:
             result[full_key] = value
     return result
@@ -33,6 +35,8 @@ def _flatten_params(params: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
 
 class Parser(ABC):
 
+    source: str = ''
+
     @abstractmethod
     def __init__(self, *args) -> None:
         pass
@@ -44,81 +48,178 @@ class Parser(ABC):
 
 class DictParser(Parser):
 
+    source = 'dict'
+
     def __init__(self, params):
         self.params = params
 
     def __call__(self, *args) -> Dict[str, Any]:
+        # source entry is a copy too, freeze replaces nested nodes in place and must not touch caller's dict
         return {
             'default': copy.deepcopy(self.params),
-            '__source__': [self.params],
+            '__source__': [copy.deepcopy(self.params)],
         }
 
 
-class TomlParser(Parser):
+class DeferredSection:
+    """
+    Top-level section of a source that is built only if it is used, see FileParser.
+    """
 
-    def __init__(self, path: str):
-        self.path = path
+    __slots__ = ('_build', 'extends')
 
-    def __call__(self, *args) -> Dict[str, Any]:
-        import tomllib
-        with open(self.path, 'rb') as fp:
-            params = tomllib.load(fp)
-        if len(params) > 0:
-            params['__source__'] = [self.path]
-        return params
+    def __init__(self, build: Callable[[], Any], extends: Any = None):
+        self._build = build
+        self.extends = extends
+
+    def build(self) -> Any:
+        return self._build()
 
 
-class YamlParser(Parser):
+class FileParser(Parser):
 
-    def __init__(self, path: str):
+    kind: str = ''
+    missing_ok: bool = False  # missing file is an empty layer
+
+    def __init__(self, path: str, cache_dir: str = None, defer_profile: str = None, extends_key: str = EXTENDS_KEY):
+        """
+        :param path: source file path
+        :param cache_dir: directory for caching parsed source, see paramflow.cache
+        :param defer_profile: if the source has this default profile section, backends able to build sections
+                              on demand return other top-level sections as DeferredSection, not with cache_dir
+        :param extends_key: key of profile sections listing profiles they extend, read from deferred sections
+        """
         self.path = path
+        self.cache_dir = cache_dir
+        self.defer_profile = defer_profile
+        self.extends_key = extends_key
+
+    @property
+    def source(self) -> str:
+        return self.path
 
     def __call__(self, *args) -> Dict[str, Any]:
-        with open(self.path, 'r') as fp:
-            params = yaml.safe_load(fp)
+        try:
+            with open(self.path, 'rb') as fp:
+                stat = os.fstat(fp.fileno())
+                data = fp.read()
+        except FileNotFoundError:
+            if self.missing_ok:
+                return {}
+            raise
+        if self.cache_dir is None:
+            params = self.parse(data)
+        else:
+            from paramflow.cache import read_cache, write_cache
+            params = read_cache(self.cache_dir, self.path, self.kind, stat, data)
+            if params is None:
+                params = self.parse(data)
+                write_cache(self.cache_dir, self.path, self.kind, stat, data, params)
         if not params:
             return {}
         params['__source__'] = [self.path]
         return params
 
+    @abstractmethod
+    def parse(self, data: bytes) -> Dict[str, Any]:
+        pass
 
-class JsonParser(Parser):
 
-    def __init__(self, path: str):
-        self.path = path
+class TomlParser(FileParser):
 
-    def __call__(self, *args) -> Dict[str, Any]:
-        with open(self.path, 'r') as fp:
-            params = json.load(fp)
-        if len(params) > 0:
-            params['__source__'] = [self.path]
+    kind = 'toml'
+
+    def parse(self, data: bytes) -> Dict[str, Any]:
+        import tomllib
+        return tomllib.loads(data.decode())
+
+
+class YamlParser(FileParser):
+
+    kind = 'yaml'
+
+    def parse(self, data: bytes) -> Dict[str, Any]:
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(
+                f"loading '{self.path}' requires yaml support: "
+                "pip install 'paramflow[yaml]'"
+            )
+        if self.defer_profile is None or self.cache_dir is not None:
+            return yaml.safe_load(data)
+        # composing is cheap with libyaml, constructing is what deferring saves
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)(data)
+        node = loader.get_single_node()
+        if not self._deferrable(node):
+            try:
+                return loader.construct_document(node) if node is not None else None
+            finally:
+                loader.dispose()
+        # sections are constructed from composed nodes on demand, the loader is kept for them
+        params = {}
+        for key_node, value_node in node.value:
+            key = loader.construct_object(key_node, deep=True)
+            if key == self.defer_profile or (isinstance(key, str) and key.startswith('__')):
+                params[key] = loader.construct_object(value_node, deep=True)
+            else:
+                params[key] = DeferredSection(functools.partial(loader.construct_object, value_node, deep=True),
+                                              self._node_extends(loader, value_node))
         return params
 
+    def _deferrable(self, node) -> bool:
+        import yaml
+        if not isinstance(node, yaml.MappingNode):
+            return False
+        keys = [key_node.value for key_node, _ in node.value if isinstance(key_node, yaml.ScalarNode)]
+        return self.defer_profile in keys and not any(key_node.tag == 'tag:yaml.org,2002:merge'
+                                                      for key_node, _ in node.value)
 
-class IniParser(Parser):
+    def _node_extends(self, loader, node) -> Any:
+        import yaml
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                if isinstance(key_node, yaml.ScalarNode) and key_node.value == self.extends_key:
+                    return loader.construct_object(value_node, deep=True)
+        return None
 
-    def __init__(self, path: str):
-        self.path = path
 
-    def __call__(self, *args) -> Dict[str, Any]:
+class JsonParser(FileParser):
+
+    kind = 'json'
+
+    def parse(self, data: bytes) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class IniParser(FileParser):
+
+    kind = 'ini'
+    missing_ok = True  # like configparser reading files
+
+    def parse(self, data: bytes) -> Dict[str, Any]:
+        import configparser
         config = configparser.ConfigParser()
-        config.read(self.path)
-        params: Dict[str, Any] = {
+        config.read_string(data.decode(), self.path)
+        return {
             section: {k: infer_type(v) for k, v in config.items(section)}
             for section in config.sections()
         }
-        if len(params) > 0:
-            params['__source__'] = [self.path]
-        return params
 
 
 class DotEnvParser(Parser):
 
-    def __init__(self, path: str, prefix: str, default_profile: str, target_profile: str = None):
+    def __init__(self, path: str, prefix: str, default_profile: str, target_profile: str = None,
+                 plan: ConversionPlan = None):
         self.path = path
         self.prefix = prefix
         self.default_profile = default_profile
         self.target_profile = target_profile
+        self.plan = plan if plan is not None else ConversionPlan()
+
+    @property
+    def source(self) -> str:
+        return self.path
 
     def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
@@ -130,10 +231,11 @@ class DotEnvParser(Parser):
             )
         if self.target_profile is None and self.default_profile in params:
             self.target_profile = self.default_profile
-        params: Dict[str, Any] = params.get(self.default_profile, params)
+        ref_params: Dict[str, Any] = params.get(self.default_profile, params)
         env = dotenv_values(self.path)
-        params = get_env_params(env, self.prefix, params)
+        params = get_env_params(env, self.prefix, ref_params, self.plan)
         if len(params) > 0:
+            _extend_plan(self.plan, params, self.target_profile, self.default_profile)
             if self.target_profile is not None:
                 params = {self.target_profile: params}
             if len(params) > 0:
@@ -141,39 +243,86 @@ class DotEnvParser(Parser):
         return params
 
 
-def get_env_params(env: Dict[str, Any], prefix: str, ref_params: Dict[str, Any]) -> Dict[str, Any]:
+class EnvIndex:
+    """
+    Snapshot of env vars taken in a single pass. Key paths of vars matching a prefix are
+    computed once per prefix, so every env layer using the same prefix only touches matching vars.
+    """
+
+    def __init__(self, env: Mapping[str, str]):
+        self._env = dict(env)
+        self._selected: Dict[str, List[Tuple[List[str], str]]] = {}
+
+    def select(self, prefix: str) -> List[Tuple[List[str], str]]:
+        """
+        :param prefix: env var prefix
+        :return: lowercase key paths split on '__' with values of vars starting with prefix
+        """
+        selected = self._selected.get(prefix)
+        if selected is None:
+            n = len(prefix)
+            selected = [(key[n:].lower().split('__'), value)
+                        for key, value in self._env.items() if key.startswith(prefix)]
+            self._selected[prefix] = selected
+        return selected
+
+
+def get_env_params(env: Union[Mapping[str, str], EnvIndex], prefix: str, ref_params: Dict[str, Any],
+                   plan: ConversionPlan = None) -> Dict[str, Any]:
+    """
+    :param plan: plan converting values of vars, if None values of vars found in ref_params are kept as strings
+                 for the merge to convert
+    """
+    if not isinstance(env, EnvIndex):
+        env = EnvIndex(env)
     params = {}
-    for env_key, env_value in env.items():
-        if env_key.startswith(prefix):
-            key = env_key.replace(prefix, '', 1).lower()
-            keys = key.split('__')
-            ref = ref_params
-            for k in keys:
-                if not isinstance(ref, dict):
-                    ref = _MISSING
-                    break
-                ref = ref.get(k, _MISSING)
-                if ref is _MISSING:
-                    break
-            _set_nested(params, keys, env_value if ref is not _MISSING else infer_type(env_value))
+    selected = env.select(prefix)
+    if plan is not None:
+        if selected:
+            plan.update(ref_params)
+        for keys, env_value in selected:
+            _set_nested(params, keys, plan.convert('__'.join(keys), env_value))
+        return params
+    for keys, env_value in selected:
+        ref = ref_params
+        for k in keys:
+            if not isinstance(ref, Mapping):
+                ref = _MISSING
+                break
+            ref = ref.get(k, _MISSING)
+            if ref is _MISSING:
+                break
+        _set_nested(params, keys, env_value if ref is not _MISSING else infer_type(env_value))
     return params
 
 
+def _extend_plan(plan: ConversionPlan, params: Dict[str, Any], target_profile: str, default_profile: str) -> None:
+    # params of the layer are merged into the reference params, later layers sharing the plan see their paths
+    if target_profile is None or target_profile == default_profile:
+        plan.extend(params)
+
+
 class EnvParser(Parser):
 
-    def __init__(self, prefix: str, default_profile: str, target_profile: str = None):
+    source = 'env'
+
+    def __init__(self, prefix: str, default_profile: str, target_profile: str = None, env: EnvIndex = None,
+                 plan: ConversionPlan = None):
         self.prefix = prefix
         self.default_profile = default_profile
         self.target_profile = target_profile
+        self.env = env
+        self.plan = plan if plan is not None else ConversionPlan()
 
     def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
         if self.target_profile is None and self.default_profile in params:
             self.target_profile = self.default_profile
         params = params.get(self.default_profile, params)
-        env = cast(Dict[str, Any], os.environ)
-        env_params = get_env_params(env, self.prefix, params)
+        env = self.env if self.env is not None else EnvIndex(os.environ)
+        env_params = get_env_params(env, self.prefix, params, self.plan)
         result: Dict[str, Any] = env_params
         if len(env_params) > 0:
+            _extend_plan(self.plan, env_params, self.target_profile, self.default_profile)
             if self.target_profile is not None:
                 result = {self.target_profile: env_params}
             if len(env_params) > 0:
@@ -187,41 +336,97 @@ class NoExitArgumentParser(argparse.ArgumentParser):
             print(message)
 
 
+def _arg_type(value: Any) -> type:
+    # lists, dicts, frozen and compiled containers are parsed from str when merged, see convert_type
+    typ = type(value)
+    return typ if typ is int or typ is float else str
+
+
+def _new_arg_parser(descr: str, no_exit: bool) -> argparse.ArgumentParser:
+    if no_exit:
+        return NoExitArgumentParser(description=descr)
+    return argparse.ArgumentParser(description=descr)
+
+
+def _flag_spec(plan: ConversionPlan, prefix: str, argv: List[str]) -> Optional[Tuple[Tuple[str, type], ...]]:
+    """
+    Argument types of the flags in argv, resolved by path, so parsing a few flags does not walk all params.
+    :return: spec, or None if a flag is not an exact leaf path, e.g. an abbreviation, which needs all params
+    """
+    spec = {}
+    flag_prefix = f'--{prefix}'
+    for arg in argv:
+        if not arg.startswith('--'):
+            continue
+        if not arg.startswith(flag_prefix):
+            return None
+        key = arg[len(flag_prefix):].split('=', 1)[0]
+        value = plan.lookup(key, _MISSING)
+        if value is _MISSING or isinstance(value, Mapping):
+            return None
+        spec[key] = _arg_type(value)
+    return tuple(spec.items())
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_arg_parser(prefix: str, descr: str, no_exit: bool, spec: Tuple[Tuple[str, type], ...]) -> argparse.ArgumentParser:
+    """
+    Build argument parser for a params shape, reused by all loads with the same keys and types.
+    Help strings depend on values, so parsers used for --help are not compiled.
+    """
+    parser = _new_arg_parser(descr, no_exit)
+    for key, typ in spec:
+        parser.add_argument(f'--{prefix}{key}', type=typ, default=None)
+    return parser
+
+
 class ArgsParser(Parser):
 
+    source = 'args'
+
     def __init__(self, prefix: str, default_profile: str, target_profile: str = None,
-                 no_exit: bool = False, descr: str = None, consume_args: bool = False):
+                 no_exit: bool = False, descr: str = None, consume_args: bool = False, plan: ConversionPlan = None):
         self.prefix = prefix
         self.default_profile = default_profile
         self.target_profile = target_profile
         self.no_exit = no_exit
         self.descr = descr
         self.consume_args = consume_args
+        self.plan = plan if plan is not None else ConversionPlan()
 
     def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
         target_profile = self.target_profile
         if target_profile is None and self.default_profile in params:
             target_profile = self.default_profile
         params = params.get(self.default_profile, params)
-        if self.no_exit:
-            parser = NoExitArgumentParser(description=self.descr)
+        plan = self.plan
+        argv = sys.argv[1:]
+        help = '--help' in argv or '-h' in argv
+        if not any(arg.startswith('-') for arg in argv):  # no flags, argparse would only return remaining
+            args_dict, remaining = {}, argv
         else:
-            parser = argparse.ArgumentParser(description=self.descr)
-        flat_params = {k: v for k, v in _flatten_params(params).items() if not k.startswith('__')}
-        for key, value in flat_params.items():
-            typ = type(value)
-            if typ is list or typ is bool or typ is tuple or value is None:
-                typ = str
-            parser.add_argument(f'--{self.prefix}{key}', type=typ, default=None, help=f'{key} = {value}')
-        args, remaining = parser.parse_known_args()
+            plan.update(params)
+            spec = None if help else _flag_spec(plan, self.prefix, argv)
+            if help:
+                parser = _new_arg_parser(self.descr, self.no_exit)
+                for key, value in plan.leaves.items():
+                    parser.add_argument(f'--{self.prefix}{key}', type=_arg_type(value), default=None,
+                                        help=f'{key} = {value}')
+            else:
+                if spec is None:
+                    spec = tuple((key, _arg_type(value)) for key, value in plan.leaves.items())
+                parser = _compile_arg_parser(self.prefix, self.descr, self.no_exit, spec)
+            args, remaining = parser.parse_known_args(argv)
+            args_dict = args.__dict__
         args_params = {}
-        for arg_key, arg_value in args.__dict__.items():
+        for arg_key, arg_value in args_dict.items():
             if arg_value is not None:
                 key = arg_key.replace(self.prefix, '', 1)
+                if type(arg_value) is str:  # argparse converted other values already
+                    arg_value = plan.convert(key, arg_value)
                 _set_nested(args_params, key.split('__'), arg_value)
 
         if self.consume_args:
-            help = '--help' in sys.argv
             sys.argv = [sys.argv[0]] + remaining
             if help:
                 sys.argv.append('--help')
@@ -233,12 +438,14 @@ class ArgsParser(Parser):
 
         result: Dict[str, Any] = args_params
         if len(args_params) > 0:
+            _extend_plan(plan, args_params, target_profile, self.default_profile)
             if target_profile is not None:
                 result = {target_profile: args_params}
             result['__source__'] = ['args']
         return result
 
 
+# format backends are imported on first parse, so finding a parser here does not import its backend
 PARSER_MAP: Final[Dict[str, Type[Parser]]] = {
     'toml': TomlParser,
     'yaml': YamlParser,
@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from paramflow.binary import encode, view, ParamsView
+
+# multiprocessing is imported on first use, it would dominate import time of paramflow
+
+# handles attached by unpickling, one per segment in this process, closed at exit
+_attached: Dict[str, 'SharedParams'] = {}
+_attached_pid: Optional[int] = None
+_attached_lock = threading.Lock()
+
+
+def _attach_segment(name: str) -> 'SharedMemory':
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        # attaching process must not unlink the segment at its exit
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+class SharedParams:
+    """
+    Handle to frozen params encoded in a shared memory segment. Pickling the handle pickles only the segment name,
+    so it can be passed to pool workers cheaply, workers attach to the segment when unpickling it.
+    All handles of a segment unpickled in a process are the same handle, it is closed when the process exits.
+    """
+
+    def __init__(self, shm: 'SharedMemory', owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._params: Optional[ParamsView] = None
+        self.closed = False
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def params(self) -> ParamsView:
+        """
+        Read-only view of shared params, nested values are decoded on first access.
+        The view is valid until the handle is closed.
+        """
+        if self._params is None:
+            self._params = view(self._shm.buf)
+        return self._params
+
+    def close(self) -> None:
+        """
+        Detach from the segment, the owner also unlinks it.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if _attached.get(self.name) is self:
+            del _attached[self.name]
+        if self._params is not None:
+            # the segment can not be closed while the view exports its buffer
+            self._params._reader.buf.release()
+            self._params = None
+        self._shm.close()
+        if self._owner:
+            self._owner = False
+            self._shm.unlink()
+
+    def __enter__(self) -> 'SharedParams':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __reduce__(self):
+        return _attach_once, (self.name,)
+
+
+def share(params: dict) -> SharedParams:
+    """
+    Encode params once into a shared memory segment, see attach.
+    The calling process owns the segment, closing its handle unlinks the segment.
+    :param params: frozen params
+    :return: handle to shared params
+    """
+    from multiprocessing import shared_memory
+    data = encode(params)
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    return SharedParams(shm, owner=True)
+
+
+def attach(name: str) -> SharedParams:
+    """
+    Attach to params shared by another process. Attaching does not depend on size of params,
+    values are decoded when accessed.
+    :param name: segment name of shared params
+    :return: handle to shared params
+    """
+    return SharedParams(_attach_segment(name), owner=False)
+
+
+def _attach_once(name: str) -> SharedParams:
+    global _attached_pid
+    with _attached_lock:
+        pid = os.getpid()
+        if _attached_pid != pid:
+            # multiprocessing runs its finalizers at exit of the main process and of its worker processes,
+            # which exit without running atexit, forked workers start with no finalizers
+            from multiprocessing import util
+            util.Finalize(None, _close_attached, exitpriority=0)
+            _attached_pid = pid
+        shared = _attached.get(name)
+        if shared is None:
+            shared = _attached[name] = attach(name)
+        return shared
+
+
+def _close_attached() -> None:
+    for shared in list(_attached.values()):
+        shared.close()
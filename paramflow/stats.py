@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+class Stage(NamedTuple):
+    name: str
+    source: Optional[str]
+    start: float
+    duration: float
+    allocated: Optional[int]
+    keys: Optional[int]
+
+
+StageCallback = Callable[[Stage], None]
+
+
+def count_keys(params: Any) -> int:
+    """
+    :return: number of leaf params in nested dicts, metadata keys are not counted
+    """
+    if not isinstance(params, dict):
+        return 0
+    count = 0
+    for key, value in dict.items(params):  # raw items, counting must not freeze lazy params
+        if isinstance(value, dict):
+            count += count_keys(value)
+        elif not (isinstance(key, str) and key.startswith('__')):
+            count += 1
+    return count
+
+
+def run_stage(on_stage: StageCallback, name: str, source: Optional[str], func: Callable, *args) -> Any:
+    """
+    Call func and report its wall time, allocated memory and number of keys in its result to on_stage.
+    Allocations are reported only while tracemalloc is tracing.
+    """
+    tracemalloc = sys.modules.get('tracemalloc')  # not imported means not tracing
+    tracing = tracemalloc is not None and tracemalloc.is_tracing()
+    if tracing:
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = func(*args)
+    duration = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0] - before if tracing else None
+    on_stage(Stage(name, source, start, duration, allocated, count_keys(result)))
+    return result
+
+
+class LoadStats:
+    """
+    Stage callback collecting stages of a load, pass it as on_stage.
+    """
+
+    def __init__(self):
+        self.stages: List[Stage] = []
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+
+    def __call__(self, stage: Stage) -> None:
+        self.stages.append(stage)
+
+    @property
+    def total(self) -> float:
+        return sum(stage.duration for stage in self.stages)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        :return: stages as Chrome trace-event JSON object with complete events, timestamps in microseconds
+        """
+        events = []
+        for stage in self.stages:
+            args = {'source': stage.source, 'keys': stage.keys}
+            if stage.allocated is not None:
+                args['allocated'] = stage.allocated
+            events.append({
+                'name': stage.name if stage.source is None else f'{stage.name} {stage.source}',
+                'cat': 'paramflow',
+                'ph': 'X',
+                'ts': stage.start * 1e6,
+                'dur': stage.duration * 1e6,
+                'pid': self._pid,
+                'tid': self._tid,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_chrome_trace(self, path: str) -> None:
+        with open(path, 'w') as fp:
+            json.dump(self.to_chrome_trace(), fp)
@@ -0,0 +1,109 @@
+import itertools
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from paramflow.frozen import freeze, ParamsDict
+from paramflow.convert import convert_type
+from paramflow.params import validate_load_args, load_meta, resolve_sources, build_parsers, activate_profiles
+from paramflow.parser import EXTENDS_KEY, EnvIndex
+
+GRID: str = 'grid'
+RANDOM: str = 'random'
+
+
+def _grid_variants(grid: Dict[str, Sequence[Any]]) -> Iterator[Dict[str, Any]]:
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def _random_variants(grid: Dict[str, Sequence[Any]], samples: int, seed: Optional[int]) -> Iterator[Dict[str, Any]]:
+    import random
+    rng = random.Random(seed)
+    for _ in range(samples):
+        yield {key: rng.choice(values) for key, values in grid.items()}
+
+
+def _check_keys(params: ParamsDict, keys: Sequence[str], profile: str) -> None:
+    for key in keys:
+        node = params
+        for part in key.split('__'):
+            if not isinstance(node, dict) or part not in node:
+                raise KeyError(f"swept param '{key}' not found in profile '{profile}'")
+            node = node[part]
+
+
+def overlay(base: ParamsDict, values: Dict[str, Any]) -> ParamsDict:
+    """
+    Override params of a frozen tree. Only nodes on overridden paths are copied, the rest is shared with base.
+    Values replace the overridden params, scalars are converted to their types, lists and dicts of any length
+    replace lists and dicts.
+    :param base: frozen params
+    :param values: values by key paths, nested keys joined with '__'
+    :return: frozen params
+    """
+    params = dict(base)
+    for key, value in values.items():
+        *parents, name = key.split('__')
+        node = params
+        for part in parents:
+            child = node.get(part, {})
+            if type(child) is not dict:  # copy frozen nodes once per path
+                child = node[part] = dict(child)
+            node = child
+        node[name] = convert_type(node.get(name), value, '.' + key.replace('__', '.'))
+    return freeze(params)
+
+
+def sweep(*sources: str | dict,
+          grid: Dict[str, Sequence[Any]],
+          profiles: Optional[List[str]] = None,
+          mode: str = GRID,
+          samples: Optional[int] = None,
+          seed: Optional[int] = None,
+          meta_env_prefix: str = 'P_',
+          meta_args_prefix: str = '',
+          env_prefix: str = 'P_',
+          args_prefix: str = '',
+          profile_key: str = 'profile',
+          extends_key: str = EXTENDS_KEY,
+          default_profile: str = 'default',
+          profile: Optional[str] = None,
+          compact: bool = False) -> Iterator[ParamsDict]:
+    """
+    Generate variants of params for a parameter sweep. Sources are parsed and merged once,
+    every variant overlays swept params on a frozen base params shared by all variants.
+    :param sources: file or multiple files to load parameters from, same as in load
+    :param grid: lists of values by param key paths, nested keys joined with '__'
+    :param profiles: profiles to sweep, defaults to the profile activated by load arguments
+    :param mode: 'grid' for all combinations of values, 'random' for samples drawn uniformly from values
+    :param samples: number of variants per profile in random mode
+    :param seed: random seed for random mode
+    :param profile: profile to activate when profiles is not given
+    :return: generator of read-only parameters as frozen dicts, profiles in outer loop, see load_profiles
+    """
+    validate_load_args(sources, profile_key, default_profile, extends_key)
+    if mode not in (GRID, RANDOM):
+        raise ValueError(f"mode must be '{GRID}' or '{RANDOM}', got '{mode}'")
+    if mode == RANDOM and samples is None:
+        raise ValueError(f"samples is required in '{RANDOM}' mode")
+    env = EnvIndex(os.environ)
+    meta = load_meta(sources, meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                     profile_key, default_profile, profile, env, extends_key)
+    parsers = build_parsers(resolve_sources(meta), meta, env=env)
+    if profiles is None:
+        profiles = [meta.profile]
+    bases = list(activate_profiles(parsers, meta.default_profile, profiles, compact, meta.extends_key).values())
+    for base in bases:
+        _check_keys(base, list(grid), base.__profile__[-1])
+
+    def generate() -> Iterator[ParamsDict]:
+        for base in bases:
+            if mode == GRID:
+                variants = _grid_variants(grid)
+            else:
+                variants = _random_variants(grid, samples, seed)
+            for values in variants:
+                yield overlay(base, values)
+
+    return generate()
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from paramflow.diff import diff
+from paramflow.frozen import ParamsDict
+from paramflow.layers import Layers
+from paramflow.memo import _file_stat
+from paramflow.params import validate_load_args, load_meta, resolve_sources, build_parsers, ENV_SOURCE, ARGS_SOURCE
+from paramflow.parser import EXTENDS_KEY, EnvIndex
+
+logger = logging.getLogger(__name__)
+
+ChangeCallback = Callable[[ParamsDict, List[str]], None]
+
+
+class Watcher:
+    """
+    Handle to params reloaded on changes of source files. The current params are swapped atomically,
+    so readers just read the current attribute without locking.
+    """
+
+    def __init__(self, layers: Layers, files: List[Tuple[int, str]], interval: float, debounce: float):
+        self.layers = layers
+        self.interval = interval
+        self.debounce = debounce
+        self.version = 0
+        self._files = files
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {path: _file_stat(path) for _, path in files}
+        self.current: ParamsDict = layers.parse()
+        self._pending: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+        self._callbacks: List[ChangeCallback] = []
+        self._stop = threading.Event()
+        # check may be called from the polling thread and by hand, reentrant for callbacks calling check
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: ChangeCallback) -> None:
+        """
+        :param callback: called with new params and list of changed key paths, nested keys joined with '__'
+        """
+        self._callbacks.append(callback)
+
+    def start(self) -> 'Watcher':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='paramflow-watch', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> 'Watcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def check(self) -> bool:
+        """
+        Poll source files once and reload params if some file changed and has been stable for debounce seconds.
+        If reloading fails, the last good params are kept. Safe to call while the polling thread runs.
+        :return: True if params changed
+        """
+        with self._lock:
+            return self._check()
+
+    def _check(self) -> bool:
+        now = time.monotonic()
+        start = None
+        for i, path in self._files:
+            stat = _file_stat(path)
+            if stat == self._stats[path]:
+                self._pending.pop(path, None)
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != stat:
+                self._pending[path] = stat, now
+                if self.debounce > 0:
+                    continue
+            elif now - pending[1] < self.debounce:
+                continue
+            del self._pending[path]
+            self._stats[path] = stat
+            start = i if start is None else min(start, i)
+        if start is None:
+            return False
+        return self._reload(start)
+
+    def _reload(self, start: int) -> bool:
+        try:
+            params = self.layers.parse(start)
+        except Exception:
+            logger.exception('Reloading params failed, keeping version %d', self.version)
+            return False
+        if params is self.current:
+            return False
+        changed = diff(self.current, params)
+        changes = [*changed.changed, *changed.added, *changed.removed]
+        self.current = params
+        self.version += 1
+        logger.debug('Reloaded params version %d, changed: %s', self.version, changes)
+        for callback in self._callbacks:
+            try:
+                callback(params, changes)
+            except Exception:
+                logger.exception('Params change callback failed')
+        return True
+
+    def _run(self) -> None:
+        while True:
+            timeout = min(self.interval, self.debounce) if self._pending and self.debounce > 0 else self.interval
+            if self._stop.wait(timeout):
+                break
+            self.check()
+
+
+def watch(*sources: str | dict,
+          meta_env_prefix: str = 'P_',
+          meta_args_prefix: str = '',
+          env_prefix: str = 'P_',
+          args_prefix: str = '',
+          profile_key: str = 'profile',
+          extends_key: str = EXTENDS_KEY,
+          default_profile: str = 'default',
+          profile: Optional[str] = None,
+          compact: bool = False,
+          interval: float = 1.0,
+          debounce: float = 0.1,
+          on_change: Optional[ChangeCallback] = None,
+          start: bool = True) -> Watcher:
+    """
+    Load parameters like load and reload them whenever a source file changes.
+    Files are polled for mtime and size changes, only layers from the first changed file on are re-parsed.
+    :param sources: file or multiple files to load parameters from
+    :param meta_env_prefix: prefix for env vars that are used to overwrite meta params
+    :param meta_args_prefix: prefix for command-line arguments to overwrite meta params
+    :param env_prefix: prefix for env vars that are used to overwrite params, if None disable auto adding env source
+    :param args_prefix: prefix for command-line arguments, if None disable auto adding args source
+    :param profile_key: parameter name for the profile
+    :param extends_key: key of profile sections listing profiles they extend
+    :param default_profile: default profile
+    :param profile: profile to activate
+    :param compact: store large homogeneous numeric lists as read-only ParamsArray, see freeze
+    :param interval: polling interval in seconds
+    :param debounce: seconds a changed file must stay unchanged before it is reloaded
+    :param on_change: callback called with new params and list of changed key paths
+    :param start: start polling thread, otherwise call check to poll
+    :return: watcher handle, current params are in its current attribute
+    """
+    validate_load_args(sources, profile_key, default_profile, extends_key)
+    env = EnvIndex(os.environ)
+    meta = load_meta(sources, meta_env_prefix, meta_args_prefix, env_prefix, args_prefix,
+                     profile_key, default_profile, profile, env, extends_key)
+    sources = resolve_sources(meta)
+    parsers = build_parsers(sources, meta, env=env)
+    files = [(i, source) for i, source in enumerate(sources)
+             if isinstance(source, str) and source not in (ENV_SOURCE, ARGS_SOURCE)]
+    layers = Layers(parsers, meta.default_profile, meta.profile, compact, meta.extends_key)
+    watcher = Watcher(layers, files, interval, debounce)
+    if on_change is not None:
+        watcher.subscribe(on_change)
+    if start:
+        watcher.start()
+    return watcher
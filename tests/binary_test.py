@@ -0,0 +1,139 @@
+import datetime
+import pickle
+import sys
+
+import pytest
+
+import paramflow as pf
+from paramflow.binary import encode, decode, view, ParamsView, ParamsListView
+from paramflow.frozen import freeze, ParamsDict, ParamsList, ParamsArray, COMPACT_MIN_SIZE
+
+
+def make_params():
+    return freeze({
+        'name': 'test',
+        'lr': 0.001,
+        'epochs': 10,
+        'debug': True,
+        'seed': None,
+        'big': 2 ** 70,
+        'date': datetime.date(2024, 1, 1),
+        'model': {'dim': 64, 'layers': [{'units': 8}, {'units': 16}]},
+        'weights': [0.5] * 300,
+        '__source__': ['params.toml'],
+    }, compact=True)
+
+
+def test_decode_round_trip():
+    params = make_params()
+    decoded = decode(encode(params))
+    assert decoded == params
+    assert type(decoded) is ParamsDict
+    assert type(decoded.model.layers) is ParamsList
+    assert type(decoded.weights) is ParamsArray
+    assert decoded.date == datetime.date(2024, 1, 1)
+
+
+def test_encode_shares_subtrees():
+    shared = freeze({'a': 1, 'b': [1, 2, 3]})
+    params = freeze({'x': shared, 'y': shared})
+    decoded = decode(encode(params))
+    assert decoded.x is decoded.y
+    assert len(encode(params)) < len(encode(freeze({'x': {'a': 1, 'b': [1, 2, 3]}, 'y': {'a': 2, 'b': [4, 5, 6]}})))
+
+
+def test_view():
+    params = make_params()
+    root = view(bytes(encode(params)))
+    assert isinstance(root, ParamsView)
+    assert root == params
+    assert root.model.dim == 64
+    assert root['model']['layers'][1].units == 16
+    assert isinstance(root.model.layers, ParamsListView)
+    assert root.model.layers == params.model.layers
+    assert root.model is root.model
+    assert 'lr' in root and 'missing' not in root
+    assert list(root) == list(params)
+    assert list(root.items()) == list(params.items())
+    assert ('lr', params.lr) in root.items()
+    assert root.get('missing', 1) == 1
+    assert root.materialize() == params
+    assert type(root.materialize()) is ParamsDict
+
+
+def test_view_immutable_and_missing():
+    root = view(encode(freeze({'a': 1})))
+    with pytest.raises(AttributeError, match="has no param 'b'"):
+        root.b
+    with pytest.raises(AttributeError):
+        root.a = 2
+    with pytest.raises(TypeError):
+        root['a'] = 2
+
+
+def test_decode_invalid():
+    with pytest.raises(ValueError, match='bad magic'):
+        decode(b'not params at all')
+
+
+@pytest.mark.parametrize('format', ['pickle', 'binary', 'msgpack'])
+def test_dumps_loads(format):
+    if format == 'msgpack':
+        pytest.importorskip('msgpack')
+    params = freeze({'a': {'b': [1, 2.5, {'c': None}]}, 'flag': False, 's': 'x', 1: 'int key',
+                     'weights': list(range(COMPACT_MIN_SIZE))}, compact=True)
+    data = pf.dumps(params, format)
+    assert type(data) is bytes
+    loaded = pf.loads(data, format)
+    assert loaded == params
+    assert type(loaded) is ParamsDict
+    assert type(loaded.a.b) is ParamsList
+    assert type(loaded.a.b[2]) is ParamsDict
+
+
+@pytest.mark.parametrize('format', ['pickle', 'binary', 'msgpack'])
+def test_dumps_loads_exact_values(format):
+    if format == 'msgpack':
+        pytest.importorskip('msgpack')
+    params = freeze({'zero': 0.0, 'neg': -0.0, 'point': (1, -0.0, 'x'), 'weights': [0.5] * COMPACT_MIN_SIZE},
+                    compact=True)
+    loaded = pf.loads(pf.dumps(params, format), format)
+    assert str(loaded.neg) == '-0.0' and str(loaded.zero) == '0.0'
+    assert type(loaded.point) is tuple and loaded.point == (1, -0.0, 'x')
+    assert str(loaded.point[1]) == '-0.0'
+    assert type(loaded.weights) is ParamsArray and loaded.weights == params.weights
+
+
+def test_dumps_default_pickle():
+    params = freeze({'a': {'b': [1]}})
+    assert pickle.loads(pf.dumps(params)) == params
+    plain = {'a': {'b': [1]}}
+    assert type(pf.loads(pf.dumps(plain)).a) is ParamsDict
+    assert type(plain['a']) is dict
+
+
+def test_encode_views_as_nodes(monkeypatch):
+    from paramflow import binary
+    params = freeze({'a': {'b': [1, {'c': 2}]}, 's': 'x'})
+    root = view(encode(params))
+    with monkeypatch.context() as patch:
+        patch.setattr(binary, '_pickle', lambda value: pytest.fail(f'pickled {value!r}'))
+        data = encode({'copy': root.a, 'items': root.a.b})
+    copied = decode(data)
+    assert copied == {'copy': params.a, 'items': params.a.b}
+    assert type(copied.copy) is ParamsDict and type(copied['items']) is ParamsList
+    assert pickle.loads(pickle.dumps(root)) == params
+    assert pf.loads(pf.dumps(root.a)) == params.a
+
+
+def test_dumps_invalid_format():
+    with pytest.raises(ValueError, match="unsupported format 'xml'"):
+        pf.dumps(freeze({}), 'xml')
+    with pytest.raises(ValueError, match="unsupported format 'xml'"):
+        pf.loads(b'', 'xml')
+
+
+def test_dumps_msgpack_missing_dependency(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'msgpack', None)
+    with pytest.raises(ImportError, match="pip install 'paramflow\\[msgpack\\]'"):
+        pf.dumps(freeze({}), 'msgpack')
@@ -0,0 +1,95 @@
+import os
+import pickle
+import sys
+
+import pytest
+
+import paramflow as pf
+from paramflow.cache import read_cache, write_cache, _cache_path
+from paramflow.parser import YamlParser, TomlParser
+
+
+def test_write_read_cache(tmp_path, temp_file):
+    path = temp_file('x = 1', '.toml')
+    stat = os.stat(path)
+    data = b'x = 1'
+    write_cache(str(tmp_path / 'cache'), path, 'toml', stat, data, {'x': 1})
+    assert read_cache(str(tmp_path / 'cache'), path, 'toml', stat, data) == {'x': 1}
+
+
+def test_read_cache_miss(tmp_path, temp_file):
+    path = temp_file('x = 1', '.toml')
+    stat = os.stat(path)
+    assert read_cache(str(tmp_path / 'cache'), path, 'toml', stat, b'x = 1') is None
+
+
+def test_read_cache_content_changed(tmp_path, temp_file):
+    path = temp_file('x = 1', '.toml')
+    stat = os.stat(path)
+    cache_dir = str(tmp_path / 'cache')
+    write_cache(cache_dir, path, 'toml', stat, b'x = 1', {'x': 1})
+    assert read_cache(cache_dir, path, 'toml', stat, b'x = 2') is None
+
+
+def test_read_cache_corrupted_entry(tmp_path, temp_file):
+    path = temp_file('x = 1', '.toml')
+    stat = os.stat(path)
+    cache_dir = str(tmp_path / 'cache')
+    write_cache(cache_dir, path, 'toml', stat, b'x = 1', {'x': 1})
+    with open(_cache_path(cache_dir, path, 'toml'), 'wb') as fp:
+        fp.write(b'garbage')
+    assert read_cache(cache_dir, path, 'toml', stat, b'x = 1') is None
+
+
+def test_parser_uses_cache(tmp_path, temp_file, monkeypatch):
+    path = temp_file('default:\n  lr: 0.001\n', '.yaml')
+    cache_dir = str(tmp_path / 'cache')
+    assert YamlParser(path, cache_dir)()['default'] == {'lr': 0.001}
+
+    def fail(*args):
+        raise AssertionError('text parser called on warm cache')
+    monkeypatch.setattr(YamlParser, 'parse', fail)
+    params = YamlParser(path, cache_dir)()
+    assert params['default'] == {'lr': 0.001}
+    assert params['__source__'] == [path]
+
+
+def test_parser_cache_invalidated(tmp_path, temp_file):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    cache_dir = str(tmp_path / 'cache')
+    assert TomlParser(path, cache_dir)()['default'] == {'lr': 0.001}
+    with open(path, 'w') as fp:
+        fp.write('[default]\nlr = 0.01\n')
+    assert TomlParser(path, cache_dir)()['default'] == {'lr': 0.01}
+
+
+def test_load_cache_dir(tmp_path, temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n[prod]\nlr = 0.01\n', '.toml')
+    cache_dir = str(tmp_path / 'cache')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, profile='prod', cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    params2 = pf.load(path, profile='prod', cache_dir=cache_dir)
+    assert params == params2
+    assert params2.lr == 0.01
+
+
+def test_write_cache_dir_mode(tmp_path, temp_file):
+    path = temp_file('x = 1', '.toml')
+    cache_dir = tmp_path / 'cache'
+    umask = os.umask(0o022)
+    try:
+        write_cache(str(cache_dir), path, 'toml', os.stat(path), b'x = 1', {'x': 1})
+    finally:
+        os.umask(umask)
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+
+def test_read_cache_foreign_owner(tmp_path, temp_file, monkeypatch):
+    path = temp_file('x = 1', '.toml')
+    stat = os.stat(path)
+    cache_dir = str(tmp_path / 'cache')
+    write_cache(cache_dir, path, 'toml', stat, b'x = 1', {'x': 1})
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(cache_dir).st_uid + 1)
+    monkeypatch.setattr(pickle, 'load', lambda fp: pytest.fail('foreign entry unpickled'))
+    assert read_cache(cache_dir, path, 'toml', stat, b'x = 1') is None
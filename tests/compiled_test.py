@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+import paramflow as pf
+from paramflow.convert import ConversionPlan
+
+CONFIG = """
+[default]
+lr = 0.001
+batch_size = 32
+[default.model]
+dim = 64
+layers = [1, 2, 3]
+[default.data]
+path = 'data.csv'
+[prod]
+lr = 0.0001
+"""
+
+
+def test_compile_and_load(temp_file, tmp_path, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    out_path = str(tmp_path / 'params.pfb')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    pf.compile(path, out_path=out_path, profile='prod')
+    params = pf.load_compiled(out_path)
+    assert isinstance(params, pf.ParamsView)
+    assert params.lr == 0.0001
+    assert params.model.layers == [1, 2, 3]
+    assert params.__profile__ == ['default', 'prod']
+    assert params == pf.load(path, profile='prod')
+    assert params.materialize() == pf.load(path, profile='prod')
+
+
+def test_compile_file_mode(temp_file, tmp_path):
+    path = temp_file(CONFIG, '.toml')
+    out_path = tmp_path / 'params.pfb'
+    umask = os.umask(0o022)
+    try:
+        pf.compile(path, out_path=str(out_path))
+    finally:
+        os.umask(umask)
+    assert out_path.stat().st_mode & 0o777 == 0o644
+
+
+def test_load_compiled_overrides(temp_file, tmp_path, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    out_path = str(tmp_path / 'params.pfb')
+    pf.compile(path, out_path=out_path)
+    monkeypatch.setenv('P_BATCH_SIZE', '64')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--model__dim', '128'])
+    params = pf.load_compiled(out_path)
+    assert params == pf.load(path)
+    assert params.batch_size == 64
+    assert params.model.dim == 128
+    assert isinstance(params.data, pf.ParamsView)
+    assert params.__source__ == [path, 'env', 'args']
+
+
+def test_load_compiled_list_overrides(temp_file, tmp_path, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    out_path = str(tmp_path / 'params.pfb')
+    pf.compile(path, out_path=out_path)
+    monkeypatch.setattr(ConversionPlan, 'leaves', property(lambda plan: pytest.fail('walked all params')))
+    monkeypatch.setenv('P_MODEL__LAYERS', '[7,8,9]')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--model__layers', '[4,5,6]', '--lr', '0.5'])
+    params = pf.load_compiled(out_path)
+    assert params.model.layers == [4, 5, 6]
+    assert params.lr == 0.5
+    assert params.model.dim == 64
+    assert isinstance(params.data, pf.ParamsView)
+
+
+def test_load_compiled_overrides_disabled(temp_file, tmp_path, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    out_path = str(tmp_path / 'params.pfb')
+    pf.compile(path, out_path=out_path)
+    monkeypatch.setenv('P_BATCH_SIZE', '64')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--batch_size', '16'])
+    params = pf.load_compiled(out_path, env_prefix=None, args_prefix=None)
+    assert params.batch_size == 32
+
+
+def test_compile_rejects_env_and_args(temp_file, tmp_path):
+    path = temp_file(CONFIG, '.toml')
+    with pytest.raises(ValueError, match='load_compiled'):
+        pf.compile(path, 'env', out_path=str(tmp_path / 'params.pfb'))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,15 @@
+import os
+from tempfile import NamedTemporaryFile
+
+import pytest
+
+
+@pytest.fixture
+def temp_file(request):
+    def create_temp_file(content, suffix):
+        tmp = NamedTemporaryFile(delete=False, mode='w+', suffix=suffix)
+        tmp.write(content)
+        tmp.close()
+        request.addfinalizer(lambda: os.remove(tmp.name))
+        return tmp.name
+    return create_temp_file
@@ -1,6 +1,10 @@
+from collections.abc import Mapping
+
 import pytest
 
-from paramflow.convert import convert_type, infer_type
+from paramflow.binary import encode, view
+from paramflow.convert import ConversionError, ConversionPlan, convert_type, infer_type
+from paramflow.frozen import COMPACT_MIN_SIZE, freeze
 
 
 def test_convert_type():
@@ -50,6 +54,58 @@ def test_convert_type_str_to_tuple():
     assert type(result) is tuple
 
 
+def test_convert_type_frozen_dst():
+    assert convert_type(freeze([1, 2, 3]), '[7, 8]') == [7, 8]
+    assert convert_type(freeze({'a': 1}), '{"b": 2}') == {'b': 2}
+    assert convert_type(freeze([1] * COMPACT_MIN_SIZE, compact=True), [7]) == [7]
+    assert convert_type(view(encode({'l': [1, 2]}))['l'], '[3]') == [3]
+    assert convert_type(view(encode({'d': {'a': 1}}))['d'], {}) == {}
+    with pytest.raises(ConversionError, match='ParamsList'):
+        convert_type(freeze([1]), 5)
+
+
 def test_convert_type_error_message_with_path():
     with pytest.raises(TypeError, match='mykey'):
         convert_type({}, 5, path='mykey')
+
+
+def test_conversion_plan():
+    plan = ConversionPlan().update({'lr': 0.1, 'debug': False, 'name': 'a', 'model': {'dim': 64}, 'layers': [1]})
+    assert plan.convert('lr', '0.5') == 0.5
+    assert plan.convert('debug', 'true') is True
+    assert plan.convert('model__dim', '128') == 128
+    assert plan.convert('name', '7') == '7'
+    assert plan.convert('model', '{"dim": 1}') == '{"dim": 1}'  # merge converts dicts and lists
+    assert plan.convert('layers', '[2]') == '[2]'
+    assert plan.convert('unknown', '7') == 7
+    assert plan.convert('model__dim', 'x') == 'x'  # merge reports the error
+    assert plan.leaves == {'lr': 0.1, 'debug': False, 'name': 'a', 'model__dim': 64, 'layers': [1]}
+
+
+def test_conversion_plan_extend():
+    ref = {'lr': 0.1}
+    plan = ConversionPlan().update(ref)
+    plan.extend({'lr': 0.2, 'batch': {'size': 32}})
+    assert plan.update(ref).convert('batch__size', '64') == 64
+    assert plan.convert('lr', '1') == 1.0
+    assert plan.update({'lr': 'a'}).convert('lr', '1') == '1'
+
+
+class Untouched(Mapping):
+
+    def __getitem__(self, key):
+        raise AssertionError('unrelated params walked')
+
+    def __iter__(self):
+        raise AssertionError('unrelated params walked')
+
+    def __len__(self):
+        raise AssertionError('unrelated params walked')
+
+
+def test_conversion_plan_resolves_paths_lazily():
+    plan = ConversionPlan().update({'lr': 0.1, 'model': {'dim': 64, 'head': Untouched()}, 'data': Untouched()})
+    assert plan.convert('lr', '0.5') == 0.5
+    assert plan.convert('model__dim', '128') == 128
+    assert plan.lookup('model__dim') == 64
+    assert plan.lookup('model__depth') is None
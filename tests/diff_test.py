@@ -0,0 +1,120 @@
+import sys
+
+import paramflow as pf
+from paramflow.frozen import freeze
+
+
+def make_params():
+    return freeze({
+        'lr': 0.1,
+        'model': {'dim': 64, 'layers': [1, 2], 'encoder': {'name': 'enc', 'dropout': 0.1}},
+        'data': {'path': '/data', 'shuffle': True},
+        '__source__': ['a.toml'],
+        '__profile__': ['default'],
+    })
+
+
+def test_diff():
+    a = make_params()
+    b = freeze({
+        'lr': 0.1,
+        'model': {'dim': 128, 'layers': [1, 2, 3], 'encoder': {'name': 'enc'}, 'heads': 8},
+        'data': {'path': '/data', 'shuffle': True},
+        'seed': 1,
+        '__source__': ['b.toml'],
+        '__profile__': ['default', 'prod'],
+    })
+    result = pf.diff(a, b)
+    assert result == pf.ParamsDiff(added=['model__heads', 'seed'], removed=['model__encoder__dropout'],
+                                   changed=['model__dim', 'model__layers'])
+    assert result.added == ['model__heads', 'seed']
+    assert pf.diff(a, make_params()) == ([], [], [])
+    assert pf.diff(a, freeze({'lr': 0.1})).removed == ['model', 'data']
+    assert pf.diff(freeze({'a': {'b': 1}}), freeze({'a': 1})).changed == ['a']
+    assert pf.diff(freeze({'a': 1}), freeze({'a': 1})).changed == []
+
+
+def test_diff_compares_types():
+    a = freeze({'a': 1, 'b': [1, 2], 'c': {'d': 0}, 'e': (1,)})
+    for b in (freeze({'a': 1.0, 'b': [1, 2], 'c': {'d': 0}, 'e': (1,)}),
+              freeze({'a': True, 'b': [1, 2.0], 'c': {'d': False}, 'e': (1,)}),
+              freeze({'a': 1, 'b': [1, 2], 'c': {'d': 0}, 'e': (1.0,)})):
+        assert a == b and a.fingerprint() == b.fingerprint()
+        assert pf.diff(a, b).changed
+    assert pf.diff(a, freeze({'a': True, 'b': [1, 2.0], 'c': {'d': False}, 'e': (1,)})).changed == ['a', 'b', 'c__d']
+    assert pf.delta(freeze({'a': 1.0, 'b': [1, 2]}), a) == {'a': 1.0}
+
+
+class CountingDict(dict):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = 0
+
+    def items(self):
+        self.reads += 1
+        return super().items()
+
+
+def test_diff_skips_shared_subtrees():
+    shared = CountingDict({'x': 1, 'y': {'z': 2}})
+    a = {'a': shared, 'b': 1}
+    b = {'a': shared, 'b': 2}
+    assert pf.diff(a, b).changed == ['b']
+    assert shared.reads == 0
+    assert pf.diff(a, a) == ([], [], [])
+
+
+def test_diff_skips_equal_fingerprints(monkeypatch):
+    diff_module = sys.modules['paramflow.diff']  # the module is shadowed by pf.diff
+    a = make_params()
+    b = make_params()
+    a.model.fingerprint()
+    b.model.fingerprint()
+    assert a.model is not b.model
+    visited = []
+    _diff = diff_module._diff
+    monkeypatch.setattr(diff_module, '_diff', lambda old, new, *args: visited.append(old) or _diff(old, new, *args))
+    assert pf.diff(a, b) == ([], [], [])
+    assert a.model not in visited and a.data in visited
+    b_model = freeze({'dim': 64, 'layers': [1, 2], 'encoder': {'name': 'enc', 'dropout': 0.2}})
+    b_model.fingerprint()
+    assert pf.diff(a, freeze({**b, 'model': b_model})).changed == ['model__encoder__dropout']
+
+
+def test_diff_fingerprints_compare_types():
+    a = freeze({'m': {'x': 1, 'y': [1, 2], 'z': (1,)}})
+    for m in ({'x': 1.0, 'y': [1, 2], 'z': (1,)}, {'x': True, 'y': [1, 2], 'z': (1,)},
+              {'x': 1, 'y': [1, 2.0], 'z': (1,)}, {'x': 1, 'y': [1, 2], 'z': (True,)}):
+        b = freeze({'m': m})
+        assert a.fingerprint() == b.fingerprint() and hash(a) == hash(b)
+        assert pf.diff(a, b).changed
+        assert pf.delta(b, a)
+    b = freeze({'m': {'x': 1, 'y': [1, 2], 'z': (1,)}})
+    b.fingerprint()
+    assert pf.diff(a, b) == ([], [], []) and not pf.delta(b, a)
+
+
+def test_diff_profiles(tmp_path, monkeypatch):
+    path = tmp_path / 'params.json'
+    path.write_text('{"default": {"lr": 0.1, "model": {"dim": 64}}, "prod": {"lr": 0.2}}')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    profiles = pf.load_profiles(str(path))
+    assert pf.diff(profiles['default'], profiles['prod']) == ([], [], ['lr'])
+    assert pf.delta(profiles['prod'], profiles['default']) == {'lr': 0.2}
+
+
+def test_delta():
+    base = make_params()
+    params = freeze({
+        'lr': 0.2,
+        'model': {'dim': 64, 'layers': [1, 2], 'encoder': {'name': 'dec', 'dropout': 0.1}},
+        'data': base.data,
+        'extra': {'a': 1},
+        '__source__': ['b.toml'],
+    })
+    result = pf.delta(params, base)
+    assert result == {'lr': 0.2, 'model': {'encoder': {'name': 'dec'}}, 'extra': {'a': 1}}
+    assert type(result) is pf.ParamsDict
+    assert result.extra is params.extra
+    assert pf.delta(base, base) == {}
@@ -1,6 +1,12 @@
+import copy
+import json
+import pickle
+from collections.abc import Sequence
+
 import pytest
 
-from paramflow.frozen import freeze, unfreeze, ParamsList, ParamsDict
+from paramflow.frozen import freeze, unfreeze, ParamsList, ParamsDict, ParamsArray, COMPACT_MIN_SIZE, \
+    LazyParamsDict, LazyParamsList, IndexedParamsDict
 
 
 def test_freeze():
@@ -56,6 +62,26 @@ def test_params_dict_missing_key():
         _ = params.z
 
 
+def test_params_dict_missing_key_default():
+    params = freeze({'x': 1})
+    assert getattr(params, 'z', 2) == 2
+    assert not hasattr(params, 'z')
+
+
+def test_params_dict_get_path():
+    params = freeze({'model': {'layers': [{'dim': 8}, {'dim': 16}], 'name': 'mlp'}, 'w': [0.5] * 300})
+    compact = freeze({'w': [0.5] * 300}, compact=True)
+    assert params.get_path('model.layers.1.dim') == 16
+    assert params.get_path('model.layers.-1.dim') == 16
+    assert params.get_path('model.name') == 'mlp'
+    assert compact.get_path('w.299') == 0.5
+    assert params.get_path('model.layers.2.dim', None) is None
+    assert params.get_path('model.name.0', None) is None
+    assert params.get_path('model.layers.x', 1) == 1
+    with pytest.raises(KeyError, match='model.depth'):
+        params.get_path('model.depth')
+
+
 def test_params_list_immutability():
     pl = freeze([1, 2, 3])
     with pytest.raises(TypeError):
@@ -96,3 +122,256 @@ def test_unfreeze_list():
     assert unfrozen[0] == 1
     assert type(unfrozen[1]) is dict
     assert type(unfrozen[2]) is list
+
+
+def test_freeze_frozen():
+    frozen = freeze({'a': {'b': 1}, 'l': [1, 2]})
+    assert freeze(frozen) is frozen
+
+
+def test_freeze_shares_frozen_subtrees():
+    shared = freeze({'b': 1, 'l': [1, 2]})
+    params = freeze({'a': shared, 'x': {'y': shared}})
+    assert params.a is shared
+    assert params.x.y is shared
+
+
+def test_unfreeze_shares_leaves():
+    leaf = ('a', 'b')
+    params = freeze({'a': {'t': leaf}})
+    unfrozen = unfreeze(params)
+    assert unfrozen['a']['t'] is leaf
+    unfrozen['a']['t'] = 1
+    assert params.a.t is leaf
+
+
+def test_freeze_compact():
+    weights = [float(i) for i in range(COMPACT_MIN_SIZE)]
+    params = freeze({'weights': weights, 'small': [1.0, 2.0]}, compact=True)
+    assert isinstance(params.weights, ParamsArray)
+    assert isinstance(params.weights, Sequence)
+    assert isinstance(params.small, ParamsList)
+    assert params.weights == weights
+    assert params.weights[3] == 3.0
+    assert params.weights[-1] == COMPACT_MIN_SIZE - 1
+    assert params.weights[1:3] == [1.0, 2.0]
+    assert len(params.weights) == COMPACT_MIN_SIZE
+    assert sum(params.weights) == sum(weights)
+
+
+def test_freeze_compact_types():
+    n = COMPACT_MIN_SIZE
+    params = freeze({
+        'ints': list(range(n)),
+        'bools': [True, False] * n,
+        'mixed': [1, 2.0] * n,
+        'big': [2 ** 70] * n,
+        'strs': ['a'] * n,
+    }, compact=True)
+    assert isinstance(params.ints, ParamsArray)
+    assert type(params.ints[1]) is int
+    assert isinstance(params.bools, ParamsArray)
+    assert params.bools[0] is True
+    assert list(params.bools[:2]) == [True, False]
+    assert isinstance(params.mixed, ParamsList)
+    assert isinstance(params.big, ParamsList)
+    assert isinstance(params.strs, ParamsList)
+
+
+def test_params_array_buffer():
+    params = freeze({'weights': [0.5] * COMPACT_MIN_SIZE}, compact=True)
+    buffer = params.weights.buffer
+    assert buffer.readonly
+    assert buffer.format == 'd'
+    assert buffer.tolist() == [0.5] * COMPACT_MIN_SIZE
+
+
+def test_params_array_immutability():
+    params = freeze({'weights': [0.5] * COMPACT_MIN_SIZE}, compact=True)
+    with pytest.raises(TypeError):
+        params.weights[0] = 1.0
+    with pytest.raises(TypeError):
+        del params.weights[0]
+
+
+def test_params_array_unfreeze_json():
+    weights = [0.5] * COMPACT_MIN_SIZE
+    params = freeze({'weights': weights}, compact=True)
+    unfrozen = unfreeze(params)
+    assert type(unfrozen['weights']) is list
+    assert json.loads(json.dumps(unfrozen)) == {'weights': weights}
+
+
+def test_params_array_pickle():
+    params = freeze({'weights': [1, 2, 3] * COMPACT_MIN_SIZE}, compact=True)
+    weights = pickle.loads(pickle.dumps(params.weights))
+    assert isinstance(weights, ParamsArray)
+    assert weights == params.weights
+
+
+def test_pickle():
+    shared = freeze({'x': 1})
+    params = freeze({'a': shared, 'b': shared, 'l': [1, {'c': [2]}], '__profile__': ['default']})
+    loaded = pickle.loads(pickle.dumps(params))
+    assert loaded == params
+    assert type(loaded) is ParamsDict and type(loaded.l) is ParamsList and type(loaded.l[1]) is ParamsDict
+    assert loaded.a is loaded.b
+    assert loaded.l[1].c == [2]
+    with pytest.raises(TypeError):
+        loaded['a'] = 1
+    assert pickle.loads(pickle.dumps(params.l)) == params.l
+    assert copy.deepcopy(params) == params
+
+
+def test_pickle_index_and_lazy():
+    params = freeze({'m': {'e': {'d': [1, {'z': 3}]}}}, index=True)
+    loaded = pickle.loads(pickle.dumps(params))
+    assert loaded == params
+    assert loaded.at('m__e__d__1__z') == 3
+    assert loaded.m.e.at('d__0') == 1
+    assert loaded.m._pf_index is loaded._pf_index
+    lazy = pickle.loads(pickle.dumps(freeze({'a': {'b': [{'c': 1}]}}, lazy=True)))
+    assert type(lazy) is LazyParamsDict
+    assert lazy.a.b[0].c == 1
+
+
+def make_lazy_source():
+    return {'a': {'b': {'c': 1}, 'l': [{'x': 1}, [2, 3]]}, 'n': 1, 's': 'str'}
+
+
+def test_freeze_lazy_defers():
+    source = make_lazy_source()
+    params = freeze(source, lazy=True)
+    assert type(params) is LazyParamsDict
+    assert type(dict.__getitem__(params, 'a')) is dict
+    a = params.a
+    assert type(a) is LazyParamsDict
+    assert params['a'] is a
+    assert type(dict.__getitem__(a, 'b')) is dict
+    assert type(a.l) is LazyParamsList
+    assert type(a.l[0]) is LazyParamsDict
+    assert a.l[0].x == 1
+    with pytest.raises(AttributeError, match="has no param 'missing'"):
+        params.missing
+    with pytest.raises(TypeError):
+        params['n'] = 2
+    with pytest.raises(TypeError):
+        a.l[0] = 2
+
+
+def test_freeze_lazy_same_results():
+    eager = freeze(make_lazy_source())
+    assert json.dumps(freeze(make_lazy_source(), lazy=True)) == json.dumps(eager)
+    lazy = freeze(make_lazy_source(), lazy=True)
+    unpacked = {**lazy}
+    assert unpacked == {**eager}
+    assert isinstance(unpacked['a'], ParamsDict)
+    assert isinstance(dict(freeze(make_lazy_source(), lazy=True))['a'], ParamsDict)
+    assert all(isinstance(v, ParamsDict) for v in freeze(make_lazy_source(), lazy=True).values() if isinstance(v, dict))
+    lazy = freeze(make_lazy_source(), lazy=True)
+    assert isinstance(lazy.get('a'), ParamsDict)
+    assert lazy.get('missing', 1) == 1
+    assert [type(v) for v in lazy.a.l] == [LazyParamsDict, LazyParamsList]
+    assert unfreeze(freeze(make_lazy_source(), lazy=True)) == make_lazy_source()
+    assert freeze(make_lazy_source(), lazy=True) == eager
+
+
+def test_freeze_lazy_list_methods():
+    def lazy_list():
+        return freeze(make_lazy_source(), lazy=True).a.l
+
+    frozen_types = [LazyParamsDict, LazyParamsList]
+    assert [type(v) for v in reversed(lazy_list())] == frozen_types[::-1]
+    assert [type(v) for v in lazy_list().copy()] == frozen_types
+    assert [type(v) for v in lazy_list() + []] == frozen_types
+    assert [type(v) for v in [0] + lazy_list()][1:] == frozen_types
+    assert [type(v) for v in lazy_list() * 2] == frozen_types * 2
+    items = lazy_list()
+    assert items.index([2, 3]) == 1 and items.count({'x': 1}) == 1 and [2, 3] in items
+    assert [type(list.__getitem__(items, i)) for i in range(2)] == frozen_types
+    lazy = freeze(make_lazy_source(), lazy=True)
+    assert type((lazy | {})['a']) is LazyParamsDict
+    assert type(({} | lazy)['a']) is LazyParamsDict
+
+
+def test_freeze_lazy_compact_rejected():
+    with pytest.raises(ValueError, match='lazy'):
+        freeze({'a': [1]}, compact=True, lazy=True)
+
+
+def test_freeze_index():
+    params = freeze({'model': {'encoder': {'layers': [{'dim': 8}, {'dim': 16}], 'name': 'enc'}}, 'lr': 0.1,
+                     '__source__': ['params.toml']}, index=True)
+    assert type(params) is IndexedParamsDict
+    assert params.at('model__encoder__layers__1__dim') == 16
+    assert params['model.encoder.layers.1.dim'] == 16
+    assert params['model.encoder.name'] == 'enc'
+    encoder = params.model.encoder
+    assert encoder.at('layers__0__dim') == 8
+    assert encoder['layers.0.dim'] == 8
+    assert encoder.layers[1].at('dim') == 16
+    assert params.at('model__encoder') is encoder
+    assert params.lr == 0.1
+    assert params.__source__ == ['params.toml']
+    with pytest.raises(KeyError):
+        params['model.decoder']
+    with pytest.raises(KeyError):
+        params.at('__source__')
+    assert params.get('model.encoder.name') == 'enc'
+    assert encoder.get('layers.1.dim') == 16
+    assert params.get('model.decoder', 1) == 1
+    assert params.get('lr') == 0.1
+    assert 'model.encoder.layers.0' in params
+    assert 'lr' in params and 'model.decoder' not in params and 'layers.0.dim' not in params
+    assert freeze({'a': [1] * COMPACT_MIN_SIZE}, compact=True, index=True).a == [1] * COMPACT_MIN_SIZE
+    assert params == freeze({'model': {'encoder': {'layers': [{'dim': 8}, {'dim': 16}], 'name': 'enc'}}, 'lr': 0.1,
+                             '__source__': ['params.toml']})
+    assert freeze(params, index=True) is params
+
+
+def test_freeze_index_off_has_no_index():
+    params = freeze({'model': {'dim': 1}})
+    assert type(params) is ParamsDict
+    assert not hasattr(params, 'at')
+    with pytest.raises(KeyError):
+        params['model.dim']
+
+
+def test_hash_and_fingerprint():
+    a = freeze({'lr': 1, 'model': {'layers': [1, 2.5, True], 'name': 'enc'}, '__source__': ['a.toml']})
+    b = freeze({'model': {'name': 'enc', 'layers': [1.0, 2.5, 1]}, 'lr': True, '__source__': ['b.toml']})
+    c = freeze({'lr': 1, 'model': {'layers': [1, 2.5, True], 'name': 'dec'}})
+    assert hash(a) == hash(b)
+    assert a.fingerprint() == b.fingerprint() != c.fingerprint()
+    assert len(a.fingerprint()) == 32
+    assert a.model.layers.fingerprint() == freeze([1, 2.5, 1]).fingerprint()
+    assert hash(a.model.layers) == hash(freeze([1.0, 2.5, True]))
+    assert {a.model: 1}[freeze({'name': 'enc', 'layers': [1, 2.5, 1]})] == 1
+    assert freeze({'a': [1]}).fingerprint() != freeze({'a': (1,)}).fingerprint()
+    assert freeze({'a': 's'}).fingerprint() != freeze({'a': ['s']}).fingerprint()
+    assert freeze({'ab': 'c'}).fingerprint() != freeze({'a': 'bc'}).fingerprint()
+
+
+def test_fingerprint_cached_on_nodes(monkeypatch):
+    from paramflow import frozen
+    shared = freeze({'x': {'y': 1}})
+    params = freeze({'a': shared, 'b': shared})
+    calls = []
+    digests = frozen._digests
+    monkeypatch.setattr(frozen, '_digests', lambda node: calls.append(node) or digests(node))
+    params.fingerprint()
+    params.fingerprint()
+    assert sum(node is shared for node in calls) == 1
+    assert freeze({'a': 1}, lazy=True).fingerprint() == freeze({'a': 1}).fingerprint()
+    big = list(range(COMPACT_MIN_SIZE))
+    assert freeze({'a': big}, compact=True).fingerprint() == freeze({'a': big}).fingerprint()
+
+
+def test_fingerprint_stable_across_processes():
+    import subprocess
+    import sys
+    code = ("import datetime, paramflow as pf; "
+            "print(pf.freeze({'a': 'x', 'b': [1.5, None], 'd': datetime.date(2024, 1, 1)}).fingerprint())")
+    digests = {subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                              env={'PYTHONHASHSEED': str(seed)}).stdout for seed in (1, 2)}
+    assert len(digests) == 1
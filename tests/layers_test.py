@@ -0,0 +1,93 @@
+import pytest
+
+from paramflow.frozen import freeze
+from paramflow.layers import Layers
+from paramflow.params import parse, activate_profile, merge_shared
+from paramflow.parser import DictParser, Parser
+
+
+class CountingParser(Parser):
+
+    def __init__(self, params):
+        self.params = params
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return {**self.params, '__source__': [f'layer{self.calls}']}
+
+
+def make_parsers():
+    return [
+        CountingParser({'default': {'model': {'dim': 128, 'layers': [1, 2]}, 'lr': 0.1}}),
+        CountingParser({'prod': {'lr': 0.01}}),
+        CountingParser({'default': {'batch_size': 32}}),
+    ]
+
+
+def test_layers_same_as_parse():
+    params = Layers(make_parsers(), 'default', 'prod').parse()
+    expected = parse(make_parsers(), 'default', 'prod')
+    assert params == expected
+    assert params.__source__ == expected.__source__
+    assert params.__profile__ == ['default', 'prod']
+
+
+def test_layers_reparse_from_layer():
+    parsers = make_parsers()
+    layers = Layers(parsers, 'default', 'prod')
+    first = layers.parse()
+    parsers[2].params = {'default': {'batch_size': 64}}
+    second = layers.parse(2)
+    assert [p.calls for p in parsers] == [1, 1, 2]
+    assert second.batch_size == 64
+    assert first.batch_size == 32
+    assert second.model is first.model
+
+
+def test_layers_unchanged_result_is_shared():
+    parsers = [DictParser({'a': {'b': 1}}), DictParser({'c': [1, 2]})]
+    layers = Layers(parsers, 'default', None)
+    first = layers.parse()
+    assert layers.parse(1) is first
+    assert layers.parse() is first
+
+
+def test_layers_conversion_error_keeps_previous():
+    parsers = make_parsers()
+    layers = Layers(parsers, 'default', None)
+    first = layers.parse()
+    parsers[2].params = {'default': {'model': {'dim': {'x': 1}}}}
+    with pytest.raises(TypeError, match='dim'):
+        layers.parse(2)
+    assert layers.params is first
+
+
+def test_merge_shared_does_not_mutate():
+    dst = freeze({'a': {'b': 1, 'c': {'d': 2}}, 'l': [{'x': 1}], 'e': {'f': 3}})
+    merged = merge_shared(dst, {'a': {'b': '10'}, 'l': [{'x': 5}], '__source__': ['s']})
+    assert merged['a'] == {'b': 10, 'c': {'d': 2}}
+    assert merged['l'] == [{'x': 5}]
+    assert merged['__source__'] == ['s']
+    assert merged['a']['c'] is dst.a.c
+    assert merged['e'] is dst.e
+    assert dst.a.b == 1
+    assert dst.l[0].x == 1
+
+
+def test_merge_shared_replaces_frozen_list_and_dict():
+    dst = freeze({'layers': [1, 2, 3], 'opt': {'lr': 1}, 'm': {'dim': 64}})
+    merged = merge_shared(dst, {'layers': '[7, 8, 9]', 'opt': '{"lr": 2, "wd": 0.1}'})
+    assert merged['layers'] == [7, 8, 9]
+    assert merged['opt'] == {'lr': 2, 'wd': 0.1}
+    merged = merge_shared(dst, {'layers': [4, 5], 'm': {}})
+    assert merged['layers'] == [4, 5]
+    assert merged['m'] == {}
+    assert dst.layers == [1, 2, 3]
+
+
+def test_activate_profile_nested_no_mutation():
+    params = {'default': {'opt': {'lr': 1}}, 'prod': {'opt': {'lr': 2}}}
+    result = activate_profile(params, 'default', 'prod')
+    assert result['opt']['lr'] == 2
+    assert params['default']['opt']['lr'] == 1
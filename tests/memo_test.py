@@ -0,0 +1,102 @@
+import sys
+
+import pytest
+
+import paramflow as pf
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    pf.cache_clear()
+    yield
+    pf.cache_resize(128)
+    pf.cache_clear()
+
+
+def test_memoize_hit(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, memoize=True)
+    assert pf.load(path, memoize=True) is params
+    info = pf.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_memoize_disabled(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    assert pf.load(path) is not pf.load(path)
+    assert pf.cache_info().currsize == 0
+
+
+def test_memoize_file_changed(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, memoize=True)
+    with open(path, 'w') as fp:
+        fp.write('[default]\nlr = 0.01\nbatch_size = 32\n')
+    params2 = pf.load(path, memoize=True)
+    assert params2 is not params
+    assert params2.lr == 0.01
+
+
+def test_memoize_env_changed(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, memoize=True)
+    monkeypatch.setenv('P_LR', '0.1')
+    params2 = pf.load(path, memoize=True)
+    assert params2 is not params
+    assert params2.lr == 0.1
+    monkeypatch.setenv('OTHER_VAR', '1')
+    assert pf.load(path, memoize=True) is params2
+
+
+def test_memoize_args_changed(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, memoize=True)
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--lr', '0.5'])
+    params2 = pf.load(path, memoize=True)
+    assert params2 is not params
+    assert params2.lr == 0.5
+
+
+def test_memoize_profile_argument(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n[prod]\nlr = 0.01\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    assert pf.load(path, memoize=True).lr == 0.001
+    assert pf.load(path, profile='prod', memoize=True).lr == 0.01
+
+
+def test_memoize_restores_consumed_meta_args(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n[prod]\nlr = 0.01\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--profile', 'prod'])
+    params = pf.load(path, memoize=True)
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--profile', 'prod'])
+    assert pf.load(path, memoize=True) is params
+    assert sys.argv == ['test.py']
+
+
+def test_memoize_lru_bound(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n[a]\nlr = 1.0\n[b]\nlr = 2.0\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    pf.cache_resize(2)
+    params_a = pf.load(path, profile='a', memoize=True)
+    pf.load(path, profile='b', memoize=True)
+    pf.load(path, profile='a', memoize=True)
+    pf.load(path, memoize=True)
+    assert pf.cache_info().currsize == 2
+    assert pf.load(path, profile='a', memoize=True) is params_a
+    assert pf.cache_info().hits == 2
+
+
+def test_cache_clear(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, memoize=True)
+    pf.cache_clear()
+    assert pf.cache_info() == (0, 0, 128, 0)
+    assert pf.load(path, memoize=True) is not params
@@ -1,24 +1,18 @@
+import argparse
+import asyncio
 import os
+import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
-from tempfile import NamedTemporaryFile
 
 import pytest
 
 import paramflow as pf
-from paramflow.params import activate_profile, deep_merge, build_parsers
-from paramflow.parser import EnvParser, DictParser, DotEnvParser, get_env_params, _flatten_params, _set_nested
-
-
-@pytest.fixture
-def temp_file(request):
-    def create_temp_file(content, suffix):
-        tmp = NamedTemporaryFile(delete=False, mode='w+', suffix=suffix)
-        tmp.write(content)
-        tmp.close()
-        request.addfinalizer(lambda: os.remove(tmp.name))
-        return tmp.name
-    return create_temp_file
+from paramflow.convert import ConversionPlan
+from paramflow.params import activate_profile, deep_merge, build_parsers, parse
+from paramflow.parser import DeferredSection, EnvIndex, EnvParser, ArgsParser, DictParser, DotEnvParser, IniParser, JsonParser, TomlParser, _compile_arg_parser, get_env_params, _flatten_params, _set_nested
 
 
 def test_deep_merge():
@@ -156,6 +150,12 @@ def test_load_all_layers(temp_file, monkeypatch):
     assert params.__profile__ == ['default', 'prod']
 
 
+def test_missing_ini_file_is_empty(tmp_path):
+    assert IniParser(str(tmp_path / 'missing.ini'))() == {}
+    with pytest.raises(FileNotFoundError):
+        JsonParser(str(tmp_path / 'missing.json'))()
+
+
 def test_custom_merge_order(temp_file, monkeypatch):
     file_toml = temp_file('[default]\nname = "local"\ndebug = true\nbatch_size=32', '.toml')
     dot_env = temp_file('P_NAME=prod', '.env')
@@ -532,7 +532,7 @@ def test_dotenv_parser_basic(temp_file):
     parser = DotEnvParser(dot_env, 'P_', 'default')
     result = parser({'default': {'name': 'bob', 'lr': 0.001}})
     assert result['default']['name'] == 'alice'
-    assert result['default']['lr'] == '0.01'
+    assert result['default']['lr'] == 0.01
     assert result['__source__'] == [dot_env]
 
 
@@ -599,3 +599,393 @@ def test_help(temp_file, monkeypatch, capsys):
     captured = capsys.readouterr()
     assert 'Meta-parameters' in captured.out
     assert 'Parameters' in captured.out
+
+
+def test_import_does_not_load_backends():
+    code = 'import sys, paramflow; print(sorted(m for m in ("yaml", "tomllib", "configparser", "dotenv") if m in sys.modules))'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'
+
+
+def test_yaml_missing_dependency(temp_file, monkeypatch):
+    file_path = temp_file('default:\n  lr: 0.001', '.yaml')
+    monkeypatch.setitem(sys.modules, 'yaml', None)
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    with pytest.raises(ImportError, match="pip install 'paramflow\\[yaml\\]'"):
+        pf.load(file_path)
+
+
+def test_env_index_select():
+    env = EnvIndex({'P_LR': '0.01', 'P_OPTIMIZER__TYPE': 'adam', 'Q_LR': '1', 'PATH': '/bin'})
+    assert env.select('P_') == [(['lr'], '0.01'), (['optimizer', 'type'], 'adam')]
+    assert env.select('P_') is env.select('P_')
+    assert env.select('Q_') == [(['lr'], '1')]
+    assert len(env.select('')) == 4
+
+
+def test_env_index_shared_by_parsers():
+    env = EnvIndex({'P_LR': '0.01', 'M_PROFILE': 'prod'})
+    meta = EnvParser('M_', 'default', env=env)({'profile': None})
+    params = EnvParser('P_', 'default', env=env)({'default': {'lr': 0.001}})
+    assert meta == {'profile': 'prod', '__source__': ['env']}
+    assert params == {'default': {'lr': 0.01}, '__source__': ['env']}
+
+
+def test_conversion_plan_shared_by_parsers(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.1\ndebug = false\n[default.model]\ndim = 64\n', '.toml')
+    monkeypatch.setenv('P_MODEL__DIM', '128')
+    monkeypatch.setenv('P_EXTRA', '5')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--debug', 'true', '--extra', '6'])
+    meta = pf.freeze({'env_prefix': 'P_', 'args_prefix': '', 'default_profile': 'default', 'profile': None})
+    parsers = build_parsers([path, 'env', 'args'], meta)
+    assert parsers[1].plan is parsers[2].plan
+    params = parse(parsers, 'default', None)
+    assert params.model.dim == 128
+    assert params.debug is True
+    assert params.extra == 6
+
+
+def test_conversion_error_full_path(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.1\n[prod.model]\ndim = 64\n[default.model]\ndim = 32\n', '.toml')
+    monkeypatch.setenv('P_MODEL__DIM', 'big')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    with pytest.raises(TypeError, match=r"unable to convert \.prod\.model\.dim <class 'str'> to <class 'int'>"):
+        pf.load(path, profile='prod')
+    with pytest.raises(TypeError, match=r'\.a\[1\]\.b'):
+        deep_merge({'a': [{}, {'b': {}}]}, {'a': [{}, {'b': 1}]})
+
+
+def test_args_parser_no_flags_skips_argparse(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    monkeypatch.setattr(argparse.ArgumentParser, 'parse_known_args', None)
+    parser = ArgsParser('', 'default')
+    assert parser({'default': {'lr': 0.001}}) == {}
+
+
+def test_args_parser_compiled_once(monkeypatch):
+    _compile_arg_parser.cache_clear()
+    parser = ArgsParser('', 'default')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--lr', '0.1'])
+    assert parser({'default': {'lr': 0.001, 'name': 'a'}}) == {'default': {'lr': 0.1}, '__source__': ['args']}
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--lr=0.2'])
+    assert parser({'default': {'lr': 0.002, 'name': 'c'}}) == {'default': {'lr': 0.2}, '__source__': ['args']}
+    info = _compile_arg_parser.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_args_parser_resolves_flags_by_path(monkeypatch):
+    parser = ArgsParser('', 'default')
+    params = {'default': {'lr': 0.001, 'lr_decay': 0.5, 'model': {'dim': 64}}}
+    monkeypatch.setattr(ConversionPlan, 'leaves', property(lambda plan: pytest.fail('walked all params')))
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--model__dim', '128', '--lr', '0.1'])
+    assert parser(params) == {'default': {'model': {'dim': 128}, 'lr': 0.1}, '__source__': ['args']}
+    monkeypatch.undo()
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--lr_d', '0.25'])  # abbreviations need all params
+    assert parser(params) == {'default': {'lr_decay': 0.25}, '__source__': ['args']}
+
+
+def test_args_parser_help_shows_values(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--help'])
+    parser = ArgsParser('', 'default', descr='Parameters')
+    with pytest.raises(SystemExit):
+        parser({'default': {'lr': 0.001}})
+    assert 'lr = 0.001' in capsys.readouterr().out
+
+
+def test_load_compact(temp_file, monkeypatch):
+    values = ', '.join(str(i / 10) for i in range(300))
+    file_path = temp_file(f'[default]\nweights = [{values}]\ntags = ["a", "b"]', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(file_path, compact=True)
+    assert isinstance(params.weights, pf.ParamsArray)
+    assert params.weights[10] == 1.0
+    assert isinstance(params.tags, pf.ParamsList)
+
+
+def test_dict_source_not_mutated(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    source = {'a': {'b': [1, 2]}}
+    pf.load(source)
+    params = pf.load(source)
+    source['a']['b'].append(3)
+    assert type(source['a']['b']) is list
+    assert params.a.b == [1, 2]
+
+
+def test_load_profiles(temp_file, monkeypatch):
+    content = """
+[default]
+lr = 0.001
+batch_size = 32
+[default.model]
+dim = 64
+[dev]
+debug = true
+[prod]
+lr = 0.0001
+"""
+    path = temp_file(content, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--batch_size', '64'])
+    monkeypatch.setenv('P_LR', '0.1')
+    profiles = pf.load_profiles(path)
+    assert list(profiles) == ['default', 'dev', 'prod']
+    for name, params in profiles.items():
+        assert params == pf.load(path, profile=name)
+        assert params.__source__ == [path, 'env', 'args']
+    assert profiles['prod'].lr == 0.1
+    assert profiles['dev'].batch_size == 64
+    assert profiles['dev'].model is profiles['prod'].model
+
+
+def test_load_profiles_selected(temp_file, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    path = temp_file('{"default": {"a": 1}, "x": {"a": 2}, "y": {"a": 3}}', '.json')
+    profiles = pf.load_profiles(path, profiles=['y'])
+    assert list(profiles) == ['y']
+    assert profiles['y'].a == 3
+    assert profiles['y'].__profile__ == ['default', 'y']
+
+
+def test_load_profiles_list_overrides(temp_file, monkeypatch):
+    content = """
+[default]
+layers = [1, 2, 3]
+dims = [8, 16]
+[prod]
+layers = [1, 2]
+"""
+    path = temp_file(content, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--dims', '[32]'])
+    monkeypatch.setenv('P_LAYERS', '[7,8,9]')
+    profiles = pf.load_profiles(path)
+    assert profiles['default'].layers == [7, 8, 9]
+    assert profiles['prod'].layers == [7, 8, 9]
+    assert profiles['prod'].dims == [32]
+
+
+def test_load_profiles_disabled(temp_file, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--lr', '5'])
+    path = temp_file('{"lr": 1, "b": {"c": 2}}', '.json')
+    profiles = pf.load_profiles(path)
+    assert list(profiles) == ['default']
+    assert profiles['default'] == {'lr': 5, 'b': {'c': 2}, '__source__': [path, 'args'], '__profile__': ['default']}
+
+
+def test_profile_extends(temp_file, monkeypatch):
+    content = """
+[default]
+region = 'us'
+replicas = 1
+debug = true
+[prod]
+replicas = 3
+debug = false
+[prod-eu]
+extends = 'prod'
+region = 'eu'
+"""
+    path = temp_file(content, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, profile='prod-eu')
+    assert params.region == 'eu'
+    assert params.replicas == 3
+    assert params.debug is False
+    assert 'extends' not in params
+    assert params.__profile__ == ['default', 'prod', 'prod-eu']
+
+
+def test_profile_extends_multiple():
+    params = {
+        'default': {'a': 0, 'b': 0, 'c': 0},
+        'x': {'a': 1},
+        'y': {'extends': 'x', 'b': 2},
+        'z': {'a': 3, 'c': 3},
+        'w': {'extends': ['y', 'z']},
+    }
+    result = activate_profile(params, 'default', 'w')
+    assert result['__profile__'] == ['default', 'x', 'y', 'z', 'w']
+    assert (result['a'], result['b'], result['c']) == (3, 2, 3)
+
+
+def test_profile_extends_resolved_once(monkeypatch):
+    from paramflow import params as params_module
+    params = {'default': {'a': 0}, 'base': {'a': 1}, 'p1': {'extends': 'base'}, 'p2': {'extends': 'base'}}
+    resolver = params_module.ProfileResolver(params, 'default')
+    calls = []
+    merge_shared = params_module.merge_shared
+    monkeypatch.setattr(params_module, 'merge_shared', lambda dst, src: calls.append(src) or merge_shared(dst, src))
+    p1 = activate_profile(params, 'default', 'p1', resolver)
+    p2 = activate_profile(params, 'default', 'p2', resolver)
+    assert p1['a'] == p2['a'] == 1
+    assert calls.count(params['base']) == 1
+
+
+def test_profile_extends_errors():
+    with pytest.raises(ValueError, match='cycle: a -> b -> a'):
+        activate_profile({'default': {}, 'a': {'extends': 'b'}, 'b': {'extends': 'a'}}, 'default', 'a')
+    with pytest.raises(ValueError, match="profile 'c' extended by 'a' not found"):
+        activate_profile({'default': {}, 'a': {'extends': 'c'}}, 'default', 'a')
+    with pytest.raises(ValueError, match='default profile'):
+        activate_profile({'default': {'extends': 'a'}, 'a': {}}, 'default', 'a')
+    with pytest.raises(ValueError, match="profile 'a': 'extends' must be a profile name"):
+        activate_profile({'default': {}, 'a': {'extends': True}}, 'default', 'a')
+    with pytest.raises(ValueError, match="profile 'a': 'inherits' must be a profile name"):
+        activate_profile({'default': {}, 'a': {'inherits': ['b', 1]}, 'b': {}}, 'default', 'a', extends_key='inherits')
+
+
+def test_load_profile_extends_missing_lists_unused(temp_file, monkeypatch):
+    path = temp_file('[default]\na = 0\n[b]\na = 1\n[c]\nextends = ["missing"]\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    with pytest.raises(ValueError, match=r"profile 'missing' extended by 'c' not found, available profiles: \['c', 'b'\]"):
+        pf.load(path, profile='c')
+
+
+def test_load_profile_extends_invalid(temp_file, monkeypatch):
+    path = temp_file('[default]\na = 0\n[c]\nextends = true\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    with pytest.raises(ValueError, match="profile 'c': 'extends' must be a profile name"):
+        pf.load(path, profile='c')
+
+
+def test_load_profiles_extends(temp_file, monkeypatch):
+    content = '{"default": {"a": 0, "m": {"x": 1}}, "prod": {"a": 1}, "prod-eu": {"extends": "prod", "b": 2}}'
+    path = temp_file(content, '.json')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    profiles = pf.load_profiles(path)
+    assert profiles['prod-eu'].a == 1
+    assert profiles['prod-eu'].__profile__ == ['default', 'prod', 'prod-eu']
+    assert profiles['prod-eu'].m is profiles['default'].m
+
+
+def test_load_extends_key(temp_file, monkeypatch):
+    toml = temp_file('[default]\nextends = 0\n[base]\na = 1\n[prod]\ninherits = "base"\nextends = 2\n', '.toml')
+    yaml_path = temp_file('default:\n  extends: 0\nbase:\n  a: 1\nprod:\n  inherits: base\n  extends: 2\n', '.yaml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    for path in (toml, yaml_path):
+        params = pf.load(path, profile='prod', extends_key='inherits')
+        assert params.extends == 2
+        assert params.a == 1
+        assert 'inherits' not in params
+        assert params.__profile__ == ['default', 'base', 'prod']
+    assert pf.load_profiles(toml, extends_key='inherits')['prod'].a == 1
+    with pytest.raises(ValueError, match='extends_key'):
+        pf.load(toml, extends_key='')
+
+
+def test_parse_selects_profiles():
+    layers = [
+        {'default': {'a': 0}, 'base': {'a': 1, 'b': 1}, 'other': {'a': 9}, 'child': {'extends': 'mid'}},
+        {'mid': {'extends': 'base', 'c': 2}, 'other': {'b': 9}},
+        {'base': {'b': 3}},
+    ]
+    parsers = [lambda params, layer=layer: layer for layer in layers]
+    for profile in [None, 'base', 'mid', 'child', 'other']:
+        selected = parse(parsers, 'default', profile)
+        merged = parse(parsers, 'default', profile, select_profiles=False)
+        assert selected == merged
+    assert parse(parsers, 'default', 'child').__profile__ == ['default', 'base', 'mid', 'child']
+
+
+def test_parse_selects_profiles_not_found():
+    parsers = [lambda params: {'default': {}, 'a': {}}, lambda params: {'b': {}}]
+    with pytest.raises(ValueError, match=r"profile 'c' not found, available profiles: \['a', 'b'\]"):
+        parse(parsers, 'default', 'c')
+
+
+def test_yaml_defers_unused_profiles(temp_file, monkeypatch):
+    content = """
+default:
+  lr: 0.1
+  when: 2024-01-01
+prod:
+  extends: base
+  lr: 0.2
+base:
+  layers: [1, 2]
+dev:
+  lr: 0.3
+"""
+    path = temp_file(content, '.yaml')
+    parser = build_parsers([path], pf.freeze({'default_profile': 'default', 'env_prefix': None}),
+                           defer_sections=True)[0]
+    layer = parser({})
+    assert isinstance(layer['prod'], DeferredSection)
+    assert layer['prod'].extends == 'base'
+    assert layer['base'].build() == {'layers': [1, 2]}
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    params = pf.load(path, profile='prod')
+    assert params.lr == 0.2
+    assert params.layers == [1, 2]
+    assert params.__profile__ == ['default', 'base', 'prod']
+
+
+def test_load_lazy(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.1\n[default.model]\ndim = 64\n[prod.model]\ndim = 128\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--model__dim', '256'])
+    params = pf.load(path, profile='prod', lazy=True)
+    assert isinstance(params, pf.LazyParamsDict)
+    assert params == pf.load(path, profile='prod')
+    assert params.model.dim == 256
+
+
+def test_load_async_same_as_load(temp_file, monkeypatch):
+    toml_path = temp_file('[default]\nlr = 0.1\nbatch_size = 32\n[default.model]\ndim = 64\n[prod]\nlr = 0.01\n', '.toml')
+    json_path = temp_file('{"default": {"model": {"dim": 128}}}', '.json')
+    yaml_path = temp_file('default:\n  batch_size: 16\n', '.yaml')
+    monkeypatch.setenv('P_LR', '0.5')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--model__dim', '256'])
+    params = asyncio.run(pf.load_async(toml_path, json_path, yaml_path, profile='prod'))
+    assert params == pf.load(toml_path, json_path, yaml_path, profile='prod')
+    assert params.__source__ == [toml_path, json_path, yaml_path, 'env', 'args']
+    assert (params.lr, params.batch_size, params.model.dim) == (0.5, 16, 256)
+
+
+def test_load_async_memoize_and_stages(temp_file, monkeypatch):
+    toml_path = temp_file('[default]\nlr = 0.1\n', '.toml')
+    json_path = temp_file('{"default": {"dim": 64}}', '.json')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    pf.cache_clear()
+    stats = pf.LoadStats()
+    params = asyncio.run(pf.load_async(toml_path, json_path, memoize=True, on_stage=stats))
+    assert asyncio.run(pf.load_async(toml_path, json_path, memoize=True)) is params
+    pf.cache_clear()
+    names = [(s.name, s.source) for s in stats.stages]
+    assert sorted(names[1:3]) == sorted([('parse', toml_path), ('parse', json_path)])
+    assert names[0] == ('meta', None) and names[3:] == [
+        ('deep_merge', toml_path), ('deep_merge', json_path),
+        ('parse', 'env'), ('deep_merge', 'env'),
+        ('parse', 'args'), ('deep_merge', 'args'),
+        ('activate_profile', None), ('freeze', None),
+    ]
+
+
+def test_load_async_reads_concurrently(temp_file, monkeypatch):
+    paths = [temp_file(f'[default]\nkey{i} = {i}\n', '.toml') for i in range(4)]
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    parse = TomlParser.parse
+
+    def slow_parse(self, data):
+        time.sleep(0.2)
+        return parse(self, data)
+    monkeypatch.setattr(TomlParser, 'parse', slow_parse)
+
+    async def main():
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+        ticker = asyncio.create_task(tick())
+        with ThreadPoolExecutor(4) as executor:
+            start = time.monotonic()
+            params = await pf.load_async(*paths, executor=executor)
+            elapsed = time.monotonic() - start
+        ticker.cancel()
+        return params, elapsed, ticks
+
+    params, elapsed, ticks = asyncio.run(main())
+    assert [params[f'key{i}'] for i in range(4)] == [0, 1, 2, 3]
+    assert elapsed < 0.6
+    assert len(ticks) > 5
@@ -0,0 +1,42 @@
+import multiprocessing
+import pickle
+
+import paramflow as pf
+
+
+def read_params(shared):
+    return shared.params.model.dim, len(shared.params.tags), shared.params.__profile__[0]
+
+
+def test_share_and_attach():
+    params = pf.freeze({'model': {'dim': 64}, 'tags': ['a'] * 1000, '__profile__': ['default']})
+    with pf.share(params) as shared:
+        assert shared.params == params
+        attached = pf.attach(shared.name)
+        assert attached.params.model.dim == 64
+        assert attached.params.materialize() == params
+        attached.close()
+
+
+def test_pickled_handle_is_small():
+    small = pf.freeze({'a': 1})
+    large = pf.freeze({'a': list(range(100000))})
+    with pf.share(small) as shared_small, pf.share(large) as shared_large:
+        assert len(pickle.dumps(shared_large)) < len(pickle.dumps(shared_small)) + 16
+        unpickled = pickle.loads(pickle.dumps(shared_large))
+        assert unpickled.params.a[99999] == 99999
+        assert pickle.loads(pickle.dumps(shared_large)) is unpickled
+        unpickled.close()
+        reattached = pickle.loads(pickle.dumps(shared_large))
+        assert reattached is not unpickled
+        reattached.close()
+
+
+def test_share_with_pool(capfd):
+    params = pf.freeze({'model': {'dim': 64}, 'tags': ['a'] * 1000, '__profile__': ['default']})
+    with pf.share(params) as shared:
+        pool = multiprocessing.get_context('spawn').Pool(2)
+        assert pool.map(read_params, [shared] * 4) == [(64, 1000, 'default')] * 4
+        pool.close()
+        pool.join()  # workers exit normally, errors detaching at exit would be written to stderr
+    assert capfd.readouterr().err == ''
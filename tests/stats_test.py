@@ -0,0 +1,77 @@
+import json
+import sys
+import tracemalloc
+
+import pytest
+
+import paramflow as pf
+from paramflow.stats import count_keys, run_stage
+
+
+def test_count_keys():
+    assert count_keys({'a': 1, 'b': {'c': 2, 'd': {'e': 3}}, '__source__': ['x']}) == 3
+    assert count_keys({}) == 0
+    assert count_keys([1, 2]) == 0
+
+
+def test_count_keys_lazy_not_frozen():
+    params = pf.freeze({'a': {'b': 1, 'c': [{'d': 2}]}}, lazy=True)
+    assert count_keys(params) == 2
+    assert type(dict.__getitem__(params, 'a')) is dict
+
+
+def test_run_stage():
+    stages = []
+    assert run_stage(stages.append, 'merge', 'file.toml', dict, {'a': 1}) == {'a': 1}
+    stage, = stages
+    assert stage.name == 'merge'
+    assert stage.source == 'file.toml'
+    assert stage.duration >= 0
+    assert stage.allocated is None
+    assert stage.keys == 1
+
+
+def test_run_stage_allocations():
+    stages = []
+    tracemalloc.start()
+    try:
+        run_stage(stages.append, 'build', None, lambda: [0] * 100000)
+    finally:
+        tracemalloc.stop()
+    assert stages[0].allocated >= 100000 * 8
+
+
+def test_load_stages(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n[default.model]\ndim = 64\n[prod]\nlr = 0.01\n', '.toml')
+    monkeypatch.setenv('P_BATCH_SIZE', '32')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    stats = pf.LoadStats()
+    params = pf.load(path, profile='prod', on_stage=stats)
+    assert params.lr == 0.01
+    assert [(s.name, s.source) for s in stats.stages] == [
+        ('meta', None),
+        ('parse', path), ('deep_merge', path),
+        ('parse', 'env'), ('deep_merge', 'env'),
+        ('parse', 'args'), ('deep_merge', 'args'),
+        ('activate_profile', 'prod'),
+        ('freeze', None),
+    ]
+    assert stats.stages[1].keys == 3
+    assert stats.stages[3].keys == 1
+    assert stats.stages[-1].keys == 3
+    assert stats.total == pytest.approx(sum(s.duration for s in stats.stages))
+
+
+def test_chrome_trace(temp_file, monkeypatch, tmp_path):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    stats = pf.LoadStats()
+    pf.load(path, on_stage=stats)
+    trace_path = str(tmp_path / 'trace.json')
+    stats.dump_chrome_trace(trace_path)
+    with open(trace_path) as fp:
+        trace = json.load(fp)
+    events = trace['traceEvents']
+    assert len(events) == len(stats.stages)
+    assert events[1]['name'] == f'parse {path}'
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
@@ -0,0 +1,78 @@
+import sys
+
+import pytest
+
+import paramflow as pf
+
+
+CONFIG = """
+[default]
+lr = 0.001
+batch_size = 32
+[default.model]
+dim = 64
+layers = 2
+[default.data]
+path = 'data.csv'
+[prod]
+lr = 0.0001
+"""
+
+
+def test_sweep_grid(temp_file, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    variants = list(pf.sweep(path, grid={'lr': [0.1, 0.01], 'model__dim': ['128', 256]}))
+    assert [(v.lr, v.model.dim) for v in variants] == [(0.1, 128), (0.1, 256), (0.01, 128), (0.01, 256)]
+    assert all(v.batch_size == 32 and v.model.layers == 2 for v in variants)
+    assert variants[0].data is variants[3].data
+    assert variants[0].model is not variants[1].model
+    assert isinstance(variants[0], pf.ParamsDict)
+
+
+def test_sweep_profiles(temp_file, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    variants = list(pf.sweep(path, grid={'batch_size': [16, 64]}, profiles=['default', 'prod']))
+    assert [(v.__profile__[-1], v.lr, v.batch_size) for v in variants] == [
+        ('default', 0.001, 16), ('default', 0.001, 64), ('prod', 0.0001, 16), ('prod', 0.0001, 64)]
+
+
+def test_sweep_random(temp_file, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    grid = {'lr': [0.1, 0.01, 0.001], 'batch_size': [16, 32, 64]}
+    first = list(pf.sweep(path, grid=grid, mode='random', samples=5, seed=1))
+    second = list(pf.sweep(path, grid=grid, mode='random', samples=5, seed=1))
+    assert len(first) == 5
+    assert first == second
+    assert all(v.lr in grid['lr'] and v.batch_size in grid['batch_size'] for v in first)
+
+
+def test_sweep_replaces_lists_and_dicts(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    base = {'layers': [1, 2, 3], 'opt': {'name': 'adam', 'lr': 0.1}, 'model': {'dim': 64}}
+    grid = {'layers': [[1, 2], [4, 5, 6, 7]], 'opt': [{'name': 'sgd'}], 'model__dim': ['128']}
+    variants = list(pf.sweep(base, grid=grid))
+    assert [v.layers for v in variants] == [[1, 2], [4, 5, 6, 7]]
+    assert all(v.opt == {'name': 'sgd'} and v.model.dim == 128 for v in variants)
+    assert isinstance(variants[0].layers, pf.ParamsList)
+
+
+def test_sweep_is_lazy(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    variants = pf.sweep({'a': 1, 'b': {'c': 2}}, grid={'a': range(10 ** 4), 'b__c': range(10 ** 4)})
+    assert [(v.a, v.b.c) for v in (next(variants), next(variants))] == [(0, 0), (0, 1)]
+
+
+def test_sweep_errors(temp_file, monkeypatch):
+    path = temp_file(CONFIG, '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    with pytest.raises(KeyError, match='model__depth'):
+        pf.sweep(path, grid={'model__depth': [1, 2]})
+    with pytest.raises(ValueError, match='samples'):
+        pf.sweep(path, grid={'lr': [0.1]}, mode='random')
+    with pytest.raises(ValueError, match='mode'):
+        pf.sweep(path, grid={'lr': [0.1]}, mode='bayes')
+    with pytest.raises(ValueError, match='not found'):
+        pf.sweep(path, grid={'lr': [0.1]}, profiles=['staging'])
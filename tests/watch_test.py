@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+
+import paramflow as pf
+
+
+def rewrite(path, content):
+    stat = os.stat(path)
+    with open(path, 'w') as fp:
+        fp.write(content)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_watch_reload(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\nbatch_size = 32\n[default.model]\ndim = 64\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    changes = []
+    watcher = pf.watch(path, debounce=0, start=False, on_change=lambda params, paths: changes.append(paths))
+    first = watcher.current
+    assert first.lr == 0.001
+    assert not watcher.check()
+    rewrite(path, '[default]\nlr = 0.01\nbatch_size = 32\n[default.model]\ndim = 64\n')
+    assert watcher.check()
+    assert watcher.current.lr == 0.01
+    assert watcher.version == 1
+    assert watcher.current.model is first.model
+    assert changes == [['lr']]
+
+
+def test_watch_reports_type_change(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 1\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    changes = []
+    watcher = pf.watch(path, debounce=0, start=False, on_change=lambda params, paths: changes.append(paths))
+    rewrite(path, '[default]\nlr = 1.0\n')
+    assert watcher.check()
+    assert changes == [['lr']]
+
+
+def test_watch_list_overrides(temp_file, monkeypatch):
+    path = temp_file('[default]\nlayers = [1, 2, 3]\n[default.model]\ndims = [8, 16]\n', '.toml')
+    monkeypatch.setenv('P_MODEL__DIMS', '[32, 64, 128]')
+    monkeypatch.setattr(sys, 'argv', ['test.py', '--layers', '[4,5,6]'])
+    watcher = pf.watch(path, debounce=0, start=False)
+    assert watcher.current.layers == [4, 5, 6]
+    assert watcher.current.model.dims == [32, 64, 128]
+    rewrite(path, '[default]\nlr = 0.1\nlayers = [1, 2]\n[default.model]\ndims = [8]\n')
+    assert watcher.check()
+    assert watcher.current.lr == 0.1
+    assert watcher.current.layers == [4, 5, 6]
+    assert watcher.current.model.dims == [32, 64, 128]
+
+
+def test_watch_keeps_last_good(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    watcher = pf.watch(path, debounce=0, start=False)
+    first = watcher.current
+    rewrite(path, '[default]\nlr = [broken\n')
+    assert not watcher.check()
+    assert watcher.current is first
+    rewrite(path, '[default]\nlr = 0.1\n')
+    assert watcher.check()
+    assert watcher.current.lr == 0.1
+
+
+def test_watch_concurrent_check(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    watcher = pf.watch(path, debounce=0, start=False)
+    rewrite(path, '[default]\nlr = 0.1\n')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(watcher.check())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert watcher.version == 1
+
+
+def test_watch_debounce(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    watcher = pf.watch(path, debounce=60, start=False)
+    rewrite(path, '[default]\nlr = 0.1\n')
+    assert not watcher.check()
+    assert watcher.current.lr == 0.001
+    watcher.debounce = 0
+    assert watcher.check()
+    assert watcher.current.lr == 0.1
+
+
+def test_watch_reparses_from_changed_layer(temp_file, monkeypatch):
+    base = temp_file('default:\n  lr: 0.001\n  name: base\n', '.yaml')
+    override = temp_file('default:\n  lr: 0.01\n', '.yaml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    watcher = pf.watch(base, override, debounce=0, start=False)
+    assert watcher.current.lr == 0.01
+    rewrite(override, 'default:\n  name: changed\n')
+    assert watcher.check()
+    assert watcher.current.lr == 0.001
+    assert watcher.current.name == 'changed'
+    assert watcher.current.__source__ == [base, override]
+
+
+def test_watch_thread(temp_file, monkeypatch):
+    path = temp_file('[default]\nlr = 0.001\n', '.toml')
+    monkeypatch.setattr(sys, 'argv', ['test.py'])
+    changed = threading.Event()
+    with pf.watch(path, interval=0.01, debounce=0.02, on_change=lambda *args: changed.set()) as watcher:
+        rewrite(path, '[default]\nlr = 0.1\n')
+        assert changed.wait(5)
+        assert watcher.current.lr == 0.1